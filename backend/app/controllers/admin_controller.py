@@ -0,0 +1,56 @@
+# 管理控制器 - 处理运行时剖析等管理类API请求
+import os
+import hmac
+from flask import request, jsonify, current_app
+
+def _check_authorization():
+    """
+    校验管理接口访问权限，通过时返回None，否则返回错误响应
+    
+    必须配置ADMIN_TOKEN并在请求头中携带 Authorization: Bearer <令牌>；
+    未配置令牌时管理接口禁用(反向代理后所有请求的来源地址都是本机，不能按地址放行)
+    """
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({"success": False, "message": "管理接口未启用: 未配置ADMIN_TOKEN"}), 403
+    provided = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(provided, f"Bearer {token}"):
+        return jsonify({"success": False, "message": "无权访问管理接口"}), 403
+    return None
+
+def start_profiling():
+    """启动限时运行时剖析(调用栈采样或内存快照)"""
+    denied = _check_authorization()
+    if denied:
+        return denied
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        mode = data.get('mode', 'stack')
+        duration = data.get('duration', 10.0)
+        
+        started = current_app.profiler.start(mode, duration)
+        if not started:
+            return jsonify({"success": False, "message": f"{mode} 剖析已在进行中"}), 409
+        
+        return jsonify({
+            "success": True,
+            "mode": mode,
+            "duration": duration,
+            "output_dir": current_app.profiler.output_dir
+        }), 202
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
+
+def get_profiling_status():
+    """获取剖析任务状态和最近一次结果文件"""
+    denied = _check_authorization()
+    if denied:
+        return denied
+    
+    return jsonify({
+        "success": True,
+        "data": current_app.profiler.status()
+    })
@@ -1,40 +1,160 @@
 # 温度控制器 - 处理温度相关API请求
+import math
+import datetime
 from flask import request, jsonify, current_app
 
+def _validate_reading(temperature, bearing_id, timestamp):
+    """校验温度上报参数，返回错误描述，参数有效时返回None"""
+    if isinstance(temperature, bool) or not isinstance(temperature, (int, float)) or not math.isfinite(temperature):
+        return f"温度必须为数值: {temperature!r}"
+    if bearing_id is not None and not isinstance(bearing_id, str):
+        return f"轴承ID必须为字符串: {bearing_id!r}"
+    if timestamp is not None:
+        try:
+            datetime.datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            return f"时间戳不是有效的ISO格式: {timestamp!r}"
+    return None
+
+def _history_query_args(default_limit, max_limit, default_span=86400.0):
+    """
+    解析历史查询参数，参数无效时抛出ValueError
+    
+    start/end为ISO格式时间，end缺省为当前时间，start缺省为end之前default_span秒；
+    bearing_id缺省为默认轴承，limit不超过max_limit
+    
+    返回:
+        (轴承ID, 开始时间, 结束时间, 条数上限)，时间为Unix时间戳
+    """
+    try:
+        end = request.args.get('end')
+        end = datetime.datetime.fromisoformat(end).timestamp() if end else datetime.datetime.now().timestamp()
+        start = request.args.get('start')
+        start = datetime.datetime.fromisoformat(start).timestamp() if start else end - default_span
+    except ValueError:
+        raise ValueError("时间范围不是有效的ISO格式")
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError(f"条数必须为整数: {request.args.get('limit')!r}")
+    if limit <= 0:
+        raise ValueError(f"条数必须为正数: {limit}")
+    bearing_id = request.args.get('bearing_id')
+    if bearing_id is None:
+        bearing_id = current_app.inspection_system.temp_monitor.bearing_id
+    return bearing_id, start, end, min(limit, max_limit)
+
 def update_bearing_temperature():
     """接收并处理轴承温度数据"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "message": "错误: 请求体不是有效的JSON对象"}), 400
         temperature = data.get('temperature')
+        bearing_id = data.get('bearing_id')
+        timestamp = data.get('timestamp')
         
         if temperature is None:
             return jsonify({"success": False, "message": "未提供温度数据"}), 400
         
+        # 参数格式错误属于客户端错误，返回400
+        error = _validate_reading(temperature, bearing_id, timestamp)
+        if error:
+            return jsonify({"success": False, "message": f"错误: {error}"}), 400
+        
         # 获取全局InspectionSystem实例
         inspection_system = current_app.inspection_system
         
-        # 评估温度
-        status = inspection_system.temp_monitor.evaluate_temperature(temperature)
+        # 评估温度(并提交持久化)
+        monitor, result = inspection_system.evaluate_temperature(bearing_id, temperature, timestamp)
         
         return jsonify({
             "success": True,
+            "bearing_id": monitor.bearing_id,
             "temperature": temperature,
-            "status": status
+            "status": result["status"],
+            "alerts": result["alerts"]
         })
     except Exception as e:
         return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
 
 def get_bearing_temperature_status():
-    """获取轴承温度监测状态"""
+    """获取轴承温度监测状态(支持ETag，状态未变化时返回304)"""
     try:
         # 获取全局InspectionSystem实例
         inspection_system = current_app.inspection_system
+        monitor = inspection_system.get_temp_monitor(request.args.get('bearing_id'))
+        
+        if monitor is None:
+            return jsonify({"success": False, "message": "未找到该轴承"}), 404
+        
+        # 取一次快照，ETag和响应体都来自同一版本的状态
+        snapshot = monitor.snapshot()
+        etag = snapshot.etag
+        
+        # 状态未变化时直接返回304，不序列化状态数据
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            body = inspection_system.status_cache.get(
+                monitor.bearing_id, etag,
+                lambda: current_app.json.dumps({
+                    "success": True,
+                    "data": snapshot.data
+                }),
+                version=snapshot.version
+            )
+            response = current_app.response_class(body, mimetype='application/json')
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
+
+def get_bearing_temperature_history():
+    """查询轴承的历史温度读数(需要配置数据库)"""
+    try:
+        store = current_app.inspection_system.store
+        if store is None:
+            return jsonify({"success": False, "message": "未配置数据库，没有历史数据"}), 404
         
-        status_data = inspection_system.temp_monitor.get_current_status()
+        try:
+            bearing_id, start, end, limit = _history_query_args(default_limit=1000, max_limit=10000)
+        except ValueError as e:
+            return jsonify({"success": False, "message": f"错误: {str(e)}"}), 400
         
+        readings = store.query_readings(bearing_id, start, end, limit)
         return jsonify({
             "success": True,
-            "data": status_data
+            "bearing_id": bearing_id,
+            "data": [
+                {
+                    "timestamp": datetime.datetime.fromtimestamp(ts).isoformat(),
+                    "temperature": temperature,
+                    "status": status
+                }
+                for ts, temperature, status in readings
+            ]
         })
     except Exception as e:
-        return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
+
+def get_bearing_temperature_alerts():
+    """查询轴承的历史告警(需要配置数据库)，按时间倒序"""
+    try:
+        store = current_app.inspection_system.store
+        if store is None:
+            return jsonify({"success": False, "message": "未配置数据库，没有历史数据"}), 404
+        
+        try:
+            bearing_id, start, end, limit = _history_query_args(default_limit=100, max_limit=1000)
+        except ValueError as e:
+            return jsonify({"success": False, "message": f"错误: {str(e)}"}), 400
+        
+        alerts = store.query_alerts(bearing_id, start, end, limit)
+        for alert in alerts:
+            alert["timestamp"] = datetime.datetime.fromtimestamp(alert["timestamp"]).isoformat()
+        return jsonify({"success": True, "bearing_id": bearing_id, "data": alerts})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"错误: {str(e)}"}), 500
@@ -1,5 +1,15 @@
 # 巡检系统模型
+import atexit
+import logging
+import threading
 from app.services.temperature_monitor import BearingTemperatureMonitor
+from app.services.status_cache import StatusResponseCache
+from app.services.reading_store import ReadingStore
+
+logger = logging.getLogger("InspectionSystem")
+
+# 未指定轴承ID时使用的默认轴承
+DEFAULT_BEARING_ID = "default"
 
 class InspectionSystem:
     """巡检系统，集成各种检测功能"""
@@ -7,7 +17,73 @@ class InspectionSystem:
     def __init__(self, model_path=None, db_path=None):
         # 初始化托辊故障检测系统...
         
-        # 添加轴承温度监测器
-        self.temp_monitor = BearingTemperatureMonitor()
+        # 添加轴承温度监测器(每个轴承一个监测器)
+        self.temp_monitor = BearingTemperatureMonitor(DEFAULT_BEARING_ID)
+        self.temp_monitors = {DEFAULT_BEARING_ID: self.temp_monitor}
+        self._monitors_lock = threading.Lock()
+        
+        # 状态接口响应缓存
+        self.status_cache = StatusResponseCache()
+        
+        # 读数和告警持久化(未配置数据库路径时只保存在内存中)
+        self.store = None
+        if db_path:
+            self.store = ReadingStore(db_path)
+            atexit.register(self.store.close)
+            self._restore_monitors()
+        
+        # 初始化其他组件...
+    
+    def _restore_monitors(self):
+        """从数据库恢复各轴承最近的状态历史"""
+        bearing_ids = self.store.bearing_ids()
+        for bearing_id in bearing_ids:
+            monitor = self.get_temp_monitor(bearing_id, create=True)
+            monitor.restore(self.store.recent_readings(bearing_id, monitor.max_history_size))
+        if bearing_ids:
+            logger.info(f"从数据库恢复 {len(bearing_ids)} 个轴承的温度状态")
+    
+    def evaluate_temperature(self, bearing_id, temperature, timestamp=None):
+        """
+        评估一条温度读数并提交持久化
+        
+        参数:
+            bearing_id: 轴承ID，为None时使用默认轴承
+            temperature: 温度值(摄氏度)
+            timestamp: 采样时间(ISO格式字符串，可选)
+        
+        返回:
+            (监测器, 评估结果字典)
+        """
+        monitor = self.get_temp_monitor(bearing_id, create=True)
+        result = monitor.evaluate_reading(temperature, timestamp)
+        
+        # 只放入写入队列，由存储的写线程批量写入数据库
+        if self.store is not None:
+            self.store.add_reading(monitor.bearing_id, result["sample_time"], temperature,
+                                   result["status"], result["alerts"])
+        
+        return monitor, result
+    
+    def get_temp_monitor(self, bearing_id=None, create=False):
+        """
+        获取指定轴承的温度监测器
+        
+        参数:
+            bearing_id: 轴承ID，为None时返回默认轴承的监测器
+            create: 不存在时是否创建
+        
+        返回:
+            BearingTemperatureMonitor实例，不存在且不创建时返回None
+        """
+        if bearing_id is None:
+            bearing_id = DEFAULT_BEARING_ID
         
-        # 初始化数据库和其他组件...
\ No newline at end of file
+        monitor = self.temp_monitors.get(bearing_id)
+        if monitor is None and create:
+            with self._monitors_lock:
+                monitor = self.temp_monitors.get(bearing_id)
+                if monitor is None:
+                    monitor = BearingTemperatureMonitor(bearing_id)
+                    self.temp_monitors[bearing_id] = monitor
+        return monitor
@@ -0,0 +1,10 @@
+# 管理相关路由定义
+from flask import Blueprint
+from app.controllers.admin_controller import start_profiling, get_profiling_status
+
+# 创建蓝图
+admin_bp = Blueprint('admin', __name__)
+
+# 注册路由
+admin_bp.route('/admin/profile', methods=['POST'])(start_profiling)
+admin_bp.route('/admin/profile', methods=['GET'])(get_profiling_status)
@@ -1,10 +1,15 @@
 # 温度相关路由定义
 from flask import Blueprint
-from app.controllers.temperature_controller import update_bearing_temperature, get_bearing_temperature_status
+from app.controllers.temperature_controller import (
+    update_bearing_temperature, get_bearing_temperature_status,
+    get_bearing_temperature_history, get_bearing_temperature_alerts
+)
 
 # 创建蓝图
 temperature_bp = Blueprint('temperature', __name__)
 
 # 注册路由
 temperature_bp.route('/bearing-temperature', methods=['POST'])(update_bearing_temperature)
-temperature_bp.route('/bearing-temperature/status', methods=['GET'])(get_bearing_temperature_status)
\ No newline at end of file
+temperature_bp.route('/bearing-temperature/status', methods=['GET'])(get_bearing_temperature_status)
+temperature_bp.route('/bearing-temperature/history', methods=['GET'])(get_bearing_temperature_history)
+temperature_bp.route('/bearing-temperature/alerts', methods=['GET'])(get_bearing_temperature_alerts)
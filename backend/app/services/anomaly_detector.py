@@ -0,0 +1,205 @@
+# 温度趋势异常检测服务 - 温升速率、基线漂移和越限预测
+import math
+
+class TemperatureTrendDetector:
+    """
+    单个轴承的在线温度趋势检测器
+
+    每次更新的时间和内存开销均为O(1)，不保存历史数据:
+        - 温升速率: 按时间指数加权的递推最小二乘直线拟合，窗口由时间常数决定
+        - 基线漂移: EWMA均值/方差作为基线，单边CUSUM检测持续高于基线的偏移
+        - 越限预测: 按当前拟合温度和温升速率估算到达告警阈值的剩余时间
+    采样间隔可以不均匀(如边缘侧压缩上报)，所有衰减系数都按实际时间间隔计算。
+    温升速率、基线漂移和越限预测告警带锁存: 进入告警状态时只告警一次，数值回落到
+    滞回带以下后才重新布防，布防后还需超过冷却时间才会再次告警。
+    """
+
+    def __init__(self, window=180.0, rate_threshold=0.5, baseline_window=3600.0,
+                 cusum_k=0.5, cusum_h=8.0, min_std=0.5, horizon=1800.0,
+                 thresholds=(60.0, 80.0), min_samples=10, min_span=60.0,
+                 hysteresis=0.2, cooldown=0.0):
+        """
+        参数:
+            window: 温升速率拟合的时间常数(秒)
+            rate_threshold: 温升速率告警阈值(°C/分钟)
+            baseline_window: 基线EWMA的时间常数(秒)
+            cusum_k: CUSUM允许偏移量(以基线标准差为单位)
+            cusum_h: CUSUM告警阈值(以基线标准差为单位)
+            min_std: 基线标准差下限(°C)，避免温度极平稳时过于敏感
+            horizon: 越限预测的时间范围(秒)，预计在该时间内越限时告警
+            thresholds: (警告阈值, 危险阈值)，与监测器一致
+            min_samples: 开始判断趋势所需的最少采样数
+            min_span: 开始判断趋势所需的最短观测时间(秒)
+            hysteresis: 滞回比例，温升速率低于阈值的(1 - hysteresis)倍、
+                        或预计越限时间超过horizon的(1 + hysteresis)倍时重新布防
+            cooldown: 同一类告警两次触发的最短间隔(秒)
+        """
+        self.window = window
+        self.rate_threshold = rate_threshold
+        self.baseline_window = baseline_window
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.min_std = min_std
+        self.horizon = horizon
+        self.thresholds = thresholds
+        self.min_samples = min_samples
+        self.min_span = min_span
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+
+        # 指数加权最小二乘的累积量，时间以最近一次采样为原点
+        self._s0 = 0.0
+        self._st = 0.0
+        self._sy = 0.0
+        self._stt = 0.0
+        self._sty = 0.0
+
+        # EWMA基线和CUSUM统计量
+        self.baseline = None
+        self.variance = 0.0
+        self.cusum = 0.0
+
+        self.samples = 0
+        self.first_time = None
+        self.last_time = None
+        self.slope = 0.0        # °C/秒
+        self.fitted = None      # 当前时刻的拟合温度
+
+        # 告警锁存: 处于告警状态的告警类型，以及各类告警上次触发的时间
+        self._latched = set()
+        self._last_fired = {}
+
+    def update(self, t, temperature):
+        """
+        输入一个采样点并返回触发的预测性告警
+
+        参数:
+            t: 采样时间(Unix时间戳，秒)
+            temperature: 温度(°C)
+
+        返回:
+            告警列表，每项为包含type和message的字典
+        """
+        if self.last_time is None:
+            self.first_time = t
+            dt = 0.0
+        else:
+            # 乱序或重复时间戳按零间隔处理
+            dt = max(t - self.last_time, 0.0)
+        self.last_time = max(t, self.last_time or t)
+        self.samples += 1
+
+        self._update_regression(dt, temperature)
+        z = self._update_baseline(dt, temperature)
+
+        if self.samples < self.min_samples or self.last_time - self.first_time < self.min_span:
+            return []
+
+        alerts = []
+        rate = self.slope * 60.0
+        if self._latch("rate_of_rise", t, rate >= self.rate_threshold,
+                       rate < self.rate_threshold * (1.0 - self.hysteresis)):
+            alerts.append({
+                "type": "rate_of_rise",
+                "rate": rate,
+                "message": f"温升速率 {rate:.2f}°C/分钟 超过阈值 {self.rate_threshold}°C/分钟"
+            })
+
+        # 基线漂移: CUSUM越过阈值时告警一次，CUSUM回落到cusum_k以下(温度回到基线附近)后重新布防
+        if self._latch("baseline_drift", t, self.cusum > self.cusum_h, self.cusum < self.cusum_k):
+            alerts.append({
+                "type": "baseline_drift",
+                "deviation": z,
+                "message": f"温度持续高于基线 {self.baseline:.1f}°C"
+            })
+
+        # 只预测尚未达到的第一个阈值；已达到的阈值保持锁存，温度回落后再重新布防
+        predicting = True
+        for level, threshold in zip(("warning", "danger"), self.thresholds):
+            if self.fitted >= threshold:
+                continue
+            eta = (threshold - self.fitted) / self.slope if self.slope > 0 else math.inf
+            if self._latch(f"predicted_{level}", t, predicting and eta <= self.horizon,
+                           eta > self.horizon * (1.0 + self.hysteresis)):
+                alerts.append({
+                    "type": f"predicted_{level}",
+                    "eta_seconds": eta,
+                    "message": f"按当前趋势预计 {eta / 60:.1f} 分钟后达到 {threshold}°C"
+                })
+            predicting = False
+
+        return alerts
+
+    def _latch(self, key, t, active, rearm):
+        """
+        告警锁存判断，返回本次是否触发告警
+
+        参数:
+            key: 告警类型
+            t: 采样时间
+            active: 当前是否满足告警条件
+            rearm: 当前是否已回落到滞回带以下(满足时解除锁存)
+        """
+        if key in self._latched:
+            if rearm:
+                self._latched.discard(key)
+            return False
+        if not active or t - self._last_fired.get(key, -math.inf) < self.cooldown:
+            return False
+        self._latched.add(key)
+        self._last_fired[key] = t
+        return True
+
+    def _update_regression(self, dt, y):
+        """平移时间原点到当前采样、按时间间隔衰减累积量，再加入新点"""
+        if dt > 0:
+            # 时间原点后移dt: 旧点的相对时间全部减去dt
+            self._stt += -2.0 * dt * self._st + dt * dt * self._s0
+            self._st -= dt * self._s0
+            self._sty -= dt * self._sy
+
+            decay = math.exp(-dt / self.window)
+            self._s0 *= decay
+            self._st *= decay
+            self._sy *= decay
+            self._stt *= decay
+            self._sty *= decay
+
+        # 新点的相对时间为0，只影响s0和sy
+        self._s0 += 1.0
+        self._sy += y
+
+        det = self._s0 * self._stt - self._st * self._st
+        if det > 1e-9:
+            self.slope = (self._s0 * self._sty - self._st * self._sy) / det
+        self.fitted = (self._sy - self.slope * self._st) / self._s0
+
+    def _update_baseline(self, dt, x):
+        """更新EWMA基线和CUSUM，返回当前点相对基线的标准化偏差"""
+        if self.baseline is None:
+            self.baseline = x
+            return 0.0
+
+        std = max(math.sqrt(self.variance), self.min_std)
+        z = (x - self.baseline) / std
+        # 上限为告警阈值的2倍，持续偏高结束后CUSUM能在有限时间内回落，告警得以重新布防
+        self.cusum = min(max(0.0, self.cusum + z - self.cusum_k), 2.0 * self.cusum_h)
+
+        # 预热阶段按累计均值更新，避免基线停留在第一个采样值上
+        alpha = 1.0 - math.exp(-dt / self.baseline_window) if dt > 0 else 0.0
+        alpha = max(alpha, 1.0 / self.samples)
+        diff = x - self.baseline
+        self.baseline += alpha * diff
+        self.variance = (1.0 - alpha) * (self.variance + alpha * diff * diff)
+        return z
+
+    def get_state(self):
+        """获取当前趋势状态"""
+        return {
+            "rate_per_minute": self.slope * 60.0,
+            "fitted_temperature": self.fitted,
+            "baseline": self.baseline,
+            "baseline_std": math.sqrt(self.variance),
+            "cusum": self.cusum,
+            "latched_alerts": tuple(sorted(self._latched))
+        }
@@ -0,0 +1,185 @@
+# 运行时性能剖析服务 - 无需重启即可对运行中的后端进程进行限时剖析
+#
+# 注意: 本文件是 sensor-system/sensors/profiler.py 的副本(不含cProfile相关部分)。
+# 后端和传感器端分别部署，没有共享的代码包，因此各保留一份；
+# 修改 _output_path、sample_stacks、capture_memory、RuntimeProfiler 时两处须同步修改。
+import os
+import re
+import sys
+import time
+import datetime
+import threading
+import logging
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger("Profiler")
+
+# 剖析结果默认输出目录
+PROFILE_DIR = 'profiles'
+
+# 单次剖析允许的最长时间(秒)，防止误操作导致长期开销
+MAX_PROFILE_DURATION = 300.0
+
+
+def _output_path(output_dir, prefix, ext):
+    """生成带时间戳和进程号的输出文件路径"""
+    os.makedirs(output_dir, exist_ok=True)
+    # 前缀中的路径分隔符等字符替换为下划线
+    prefix = re.sub(r'[^\w.-]', '_', prefix)
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f"{prefix}_{stamp}_{os.getpid()}.{ext}")
+
+
+def _clamp_duration(duration):
+    """限制剖析时长在(0, MAX_PROFILE_DURATION]区间内"""
+    duration = float(duration)
+    if duration <= 0:
+        raise ValueError("剖析时长必须大于0")
+    return min(duration, MAX_PROFILE_DURATION)
+
+
+def sample_stacks(duration, interval=0.005, output_dir=PROFILE_DIR):
+    """
+    采样式调用栈捕获
+
+    定时抓取所有线程(采样线程自身除外)的调用栈，按折叠格式汇总后写入文件，
+    结果可直接用 flamegraph.pl 或 speedscope 查看。
+
+    参数:
+        duration: 采样时长(秒)
+        interval: 采样间隔(秒)
+        output_dir: 输出目录
+
+    返回:
+        输出文件路径
+    """
+    duration = _clamp_duration(duration)
+    own_id = threading.get_ident()
+    names = {}
+    counts = Counter()
+    samples = 0
+
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        names.update((t.ident, t.name) for t in threading.enumerate())
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            counts[';'.join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    path = _output_path(output_dir, 'stacks', 'folded')
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+    logger.info(f"调用栈采样完成: {samples} 次采样, 结果写入 {path}")
+    return path
+
+
+def capture_memory(duration, top=50, output_dir=PROFILE_DIR):
+    """
+    tracemalloc 内存快照
+
+    在剖析窗口起止各取一次快照，输出窗口内的内存增长排行和结束时的完整快照。
+
+    参数:
+        duration: 观察时长(秒)
+        top: 报告中列出的条目数
+        output_dir: 输出目录
+
+    返回:
+        文本报告路径
+    """
+    duration = _clamp_duration(duration)
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(25)
+
+    try:
+        baseline = tracemalloc.take_snapshot()
+        time.sleep(duration)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    snapshot_path = _output_path(output_dir, 'memory', 'tracemalloc')
+    snapshot.dump(snapshot_path)
+
+    report_path = _output_path(output_dir, 'memory', 'txt')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"# 内存增长排行(观察 {duration:.1f} 秒)\n")
+        for stat in snapshot.compare_to(baseline, 'lineno')[:top]:
+            f.write(f"{stat}\n")
+        f.write("\n# 当前内存占用排行\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            f.write(f"{stat}\n")
+
+    logger.info(f"内存快照完成, 报告写入 {report_path}")
+    return report_path
+
+
+class RuntimeProfiler:
+    """运行时剖析调度器，在后台线程中执行限时的调用栈采样和内存快照"""
+
+    MODES = ('stack', 'memory')
+
+    def __init__(self, output_dir=PROFILE_DIR):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.results = {}
+
+    def start(self, mode, duration):
+        """
+        启动一次后台剖析
+
+        参数:
+            mode: 'stack'(调用栈采样) 或 'memory'(tracemalloc快照)
+            duration: 剖析时长(秒)
+
+        返回:
+            是否成功启动(同一模式同时只允许一个任务)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的剖析模式: {mode}")
+        duration = _clamp_duration(duration)
+
+        with self._lock:
+            job = self._jobs.get(mode)
+            if job is not None and job.is_alive():
+                logger.warning(f"{mode} 剖析已在进行中")
+                return False
+            job = threading.Thread(target=self._run, args=(mode, duration),
+                                   name=f"profiler-{mode}", daemon=True)
+            self._jobs[mode] = job
+            job.start()
+        return True
+
+    def _run(self, mode, duration):
+        try:
+            if mode == 'stack':
+                path = sample_stacks(duration, output_dir=self.output_dir)
+            else:
+                path = capture_memory(duration, output_dir=self.output_dir)
+            self.results[mode] = path
+        except Exception as e:
+            logger.error(f"{mode} 剖析失败: {str(e)}")
+
+    def status(self):
+        """返回各模式的运行状态和最近一次结果文件"""
+        with self._lock:
+            running = [mode for mode, job in self._jobs.items() if job.is_alive()]
+        return {
+            'running': running,
+            'results': dict(self.results)
+        }
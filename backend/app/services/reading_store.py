@@ -0,0 +1,368 @@
+# 温度读数和告警的持久化存储 - SQLite(WAL模式)，后台线程批量写入，按天分表并按保留期删除旧表
+import json
+import time
+import queue
+import sqlite3
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger("ReadingStore")
+
+# 队列结束标记
+_STOP = object()
+
+
+class ReadingStore:
+    """
+    读数和告警存储
+
+    写入: 请求线程只把记录放入内存队列(不阻塞、不访问数据库)，由专用写线程
+          每批最多batch_size条在一个事务中用executemany写入，同一SQL的预编译语句
+          由sqlite3模块缓存复用。
+    分区: 读数按采样日期写入 readings_YYYYMMDD 表，每张表有 (bearing_id, ts) 索引；
+          超过保留期的整张表直接DROP，不需要逐行DELETE。
+    读取: 使用连接池中的只读连接，WAL模式下读写互不阻塞。
+    """
+
+    def __init__(self, db_path, retention_days=30, batch_size=5000, flush_interval=0.2,
+                 max_pending=1000000, pool_size=4, prune_interval=60.0):
+        """
+        初始化存储并启动写线程
+
+        参数:
+            db_path: SQLite数据库文件路径
+            retention_days: 读数和告警的保留天数
+            batch_size: 每个事务最多写入的记录数
+            flush_interval: 队列为空时写线程的等待时间(秒)，即写入的最大延迟
+            max_pending: 队列中最多缓存的记录数，超过时丢弃新记录并计数
+            pool_size: 读连接池大小
+            prune_interval: 写线程检查过期数据的间隔(秒)，按单调时钟计时，持续写入时同样生效
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._partitions = set()
+        self._pruned_day = None
+        self._next_prune = 0.0
+
+        # 统计信息
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        # 建表在调用线程中完成，保证构造返回后即可读取
+        conn = self._connect()
+        self._init_schema(conn)
+        self._partitions.update(self._list_partitions(conn))
+        conn.close()
+
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect(readonly=True))
+
+        self._writer = threading.Thread(target=self._write_loop, name="ReadingStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self, readonly=False):
+        """创建数据库连接(WAL模式，写锁冲突时等待而不是立即报错)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _init_schema(self, conn):
+        """创建告警表和轴承索引表(读数表按天创建)"""
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "bearing_id TEXT NOT NULL, ts REAL NOT NULL, type TEXT NOT NULL, "
+                "message TEXT, detail TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_bearing_ts ON alerts (bearing_id, ts)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bearings ("
+                "bearing_id TEXT PRIMARY KEY, last_ts REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def _list_partitions(conn):
+        """列出已有的读数分区表名"""
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name GLOB 'readings_[0-9]*'"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _partition(ts):
+        """采样时间对应的分区表名"""
+        return "readings_" + datetime.datetime.fromtimestamp(ts).strftime("%Y%m%d")
+
+    # ------------------------------------------------------------------
+    # 写入(请求线程调用，只入队)
+    # ------------------------------------------------------------------
+
+    def add_reading(self, bearing_id, ts, temperature, status, alerts=None):
+        """
+        提交一条温度读数(及其触发的告警)
+
+        参数:
+            bearing_id: 轴承ID
+            ts: 采样时间(Unix时间戳，秒)
+            temperature: 温度(°C)
+            status: 状态等级
+            alerts: 该读数触发的告警列表(可选)
+
+        返回:
+            是否成功入队(队列已满时丢弃并返回False)
+        """
+        try:
+            self._queue.put_nowait((bearing_id, ts, temperature, status, alerts or None))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 10000 == 1:
+                logger.warning(f"写入队列已满，已丢弃 {self.dropped} 条读数")
+            return False
+
+    def flush(self, timeout=None):
+        """等待队列中已提交的记录全部写入"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """写完剩余记录后停止写线程并关闭所有连接"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # ------------------------------------------------------------------
+    # 写线程
+    # ------------------------------------------------------------------
+
+    def _write_loop(self):
+        """专用写线程: 攒批后在一个事务中写入"""
+        conn = self._connect()
+        stopping = False
+        try:
+            while not stopping:
+                # 按时间而不是按队列空闲调度清理，持续高负载写入时也不会跳过
+                now = time.monotonic()
+                if now >= self._next_prune:
+                    self._prune(conn)
+                    self._next_prune = now + self.prune_interval
+
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+
+                batch = []
+                waiters = []
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    if stopping or len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                    except Exception as e:
+                        logger.error(f"批量写入失败，丢弃 {len(batch)} 条读数: {str(e)}")
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        """按分区分组后在一个事务中写入读数、告警和轴承最新时间"""
+        partitions = {}
+        alerts = []
+        latest = {}
+        day_start = day_end = None
+        for bearing_id, ts, temperature, status, reading_alerts in batch:
+            # 同一批读数通常属于同一天，只在越过日期边界时重新计算分区
+            if day_start is None or not day_start <= ts < day_end:
+                day_start, day_end, rows = self._day_bounds(ts, partitions)
+            rows.append((bearing_id, ts, temperature, status))
+            if ts > latest.get(bearing_id, float('-inf')):
+                latest[bearing_id] = ts
+            if reading_alerts:
+                for alert in reading_alerts:
+                    detail = {k: v for k, v in alert.items() if k not in ('type', 'message')}
+                    alerts.append((bearing_id, ts, alert['type'], alert.get('message'),
+                                   json.dumps(detail, ensure_ascii=False)))
+
+        with conn:
+            for table, rows in partitions.items():
+                if table not in self._partitions:
+                    self._create_partition(conn, table)
+                conn.executemany(
+                    f"INSERT INTO {table} (bearing_id, ts, temperature, status) VALUES (?, ?, ?, ?)", rows
+                )
+            if alerts:
+                conn.executemany(
+                    "INSERT INTO alerts (bearing_id, ts, type, message, detail) VALUES (?, ?, ?, ?, ?)", alerts
+                )
+            conn.executemany(
+                "INSERT INTO bearings (bearing_id, last_ts) VALUES (?, ?) "
+                "ON CONFLICT(bearing_id) DO UPDATE SET last_ts = max(last_ts, excluded.last_ts)",
+                latest.items()
+            )
+
+        self.written += len(batch)
+        self.batches += 1
+
+    def _day_bounds(self, ts, partitions):
+        """返回采样时间所在日期的起止时间戳，以及该日分区在本批中的行列表"""
+        day = datetime.datetime.fromtimestamp(ts).date()
+        start = datetime.datetime.combine(day, datetime.time()).timestamp()
+        end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp()
+        table = "readings_" + day.strftime("%Y%m%d")
+        return start, end, partitions.setdefault(table, [])
+    
+    def _create_partition(self, conn, table):
+        """创建一天的读数分区表及其索引"""
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "bearing_id TEXT NOT NULL, ts REAL NOT NULL, temperature REAL NOT NULL, status TEXT NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_bearing_ts ON {table} (bearing_id, ts)")
+        self._partitions.add(table)
+
+    def _prune(self, conn):
+        """删除超过保留期的分区表和告警(在写线程中按prune_interval检查，每天最多执行一次)"""
+        today = datetime.date.today()
+        if self.retention_days is None or self._pruned_day == today:
+            return
+        self._pruned_day = today
+
+        cutoff = today - datetime.timedelta(days=self.retention_days)
+        oldest = "readings_" + cutoff.strftime("%Y%m%d")
+        expired = sorted(table for table in self._partitions if table < oldest)
+        try:
+            with conn:
+                for table in expired:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    self._partitions.discard(table)
+                cutoff_ts = datetime.datetime.combine(cutoff, datetime.time()).timestamp()
+                conn.execute("DELETE FROM alerts WHERE ts < ?", (cutoff_ts,))
+                conn.execute("DELETE FROM bearings WHERE last_ts < ?", (cutoff_ts,))
+            if expired:
+                logger.info(f"删除 {len(expired)} 个过期分区: {expired[0]} ~ {expired[-1]}")
+        except Exception as e:
+            logger.error(f"删除过期数据失败: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # 读取(连接池)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _reader(self):
+        """从连接池借出一个只读连接"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _partitions_desc(self, conn):
+        """按日期从新到旧列出分区表(包括其他进程创建的分区)"""
+        return sorted(self._list_partitions(conn), reverse=True)
+
+    def bearing_ids(self):
+        """列出保留期内有读数的轴承ID"""
+        with self._reader() as conn:
+            return [row[0] for row in conn.execute("SELECT bearing_id FROM bearings ORDER BY bearing_id")]
+
+    def recent_readings(self, bearing_id, limit=100):
+        """
+        获取指定轴承最近的读数
+
+        返回:
+            [(ts, temperature, status), ...]，按时间升序
+        """
+        readings = []
+        with self._reader() as conn:
+            for table in self._partitions_desc(conn):
+                rows = conn.execute(
+                    f"SELECT ts, temperature, status FROM {table} WHERE bearing_id = ? "
+                    "ORDER BY ts DESC LIMIT ?", (bearing_id, limit - len(readings))
+                ).fetchall()
+                readings.extend(rows)
+                if len(readings) >= limit:
+                    break
+        readings.reverse()
+        return readings
+
+    def query_readings(self, bearing_id, start, end, limit=10000):
+        """
+        查询时间范围内的读数
+
+        参数:
+            bearing_id: 轴承ID
+            start, end: 时间范围(Unix时间戳，含两端)
+            limit: 最多返回的条数
+
+        返回:
+            [(ts, temperature, status), ...]，按时间升序
+        """
+        first = self._partition(start)
+        last = self._partition(end)
+        readings = []
+        with self._reader() as conn:
+            for table in reversed(self._partitions_desc(conn)):
+                if table < first or table > last:
+                    continue
+                rows = conn.execute(
+                    f"SELECT ts, temperature, status FROM {table} WHERE bearing_id = ? AND ts BETWEEN ? AND ? "
+                    "ORDER BY ts LIMIT ?", (bearing_id, start, end, limit - len(readings))
+                ).fetchall()
+                readings.extend(rows)
+                if len(readings) >= limit:
+                    break
+        return readings
+
+    def query_alerts(self, bearing_id, start=None, end=None, limit=1000):
+        """查询告警记录，按时间倒序"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT ts, type, message, detail FROM alerts WHERE bearing_id = ? AND ts BETWEEN ? AND ? "
+                "ORDER BY ts DESC LIMIT ?",
+                (bearing_id, start if start is not None else float('-inf'),
+                 end if end is not None else float('inf'), limit)
+            ).fetchall()
+        return [
+            {"timestamp": ts, "type": alert_type, "message": message, **json.loads(detail or '{}')}
+            for ts, alert_type, message, detail in rows
+        ]
+
+    def get_stats(self):
+        """获取写入统计信息"""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "pending": self._queue.qsize(),
+            "partitions": len(self._partitions)
+        }
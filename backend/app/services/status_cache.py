@@ -0,0 +1,47 @@
+# 状态接口响应缓存 - 按轴承缓存序列化后的状态数据
+import threading
+
+class StatusResponseCache:
+    """
+    按轴承缓存状态接口的响应体
+    
+    以监测器的ETag(实例标识+状态版本号)作为缓存键，只有evaluate_temperature
+    改变了监测器状态时才会重新构建和序列化，未变化的轮询直接复用缓存。
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, bearing_id, etag, build, version=None):
+        """
+        获取缓存的响应体
+        
+        参数:
+            bearing_id: 轴承ID
+            etag: 当前状态对应的ETag
+            build: 缓存失效时调用，返回序列化后的响应体
+            version: ETag对应的状态版本号(可选)，用于避免并发请求中较慢的
+                     旧版本响应覆盖已缓存的新版本
+        
+        返回:
+            响应体(str)
+        """
+        entry = self._entries.get(bearing_id)
+        if entry is not None and entry[0] == etag:
+            return entry[1]
+        
+        body = build()
+        with self._lock:
+            current = self._entries.get(bearing_id)
+            if current is None or version is None or current[2] is None or current[2] < version:
+                self._entries[bearing_id] = (etag, body, version)
+        return body
+    
+    def invalidate(self, bearing_id=None):
+        """使指定轴承(或全部)的缓存失效"""
+        with self._lock:
+            if bearing_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(bearing_id, None)
@@ -1,10 +1,26 @@
 # 轴承温度监测服务
+import time
 import datetime
+import threading
+import uuid
+from collections import deque, namedtuple
+from app.services.anomaly_detector import TemperatureTrendDetector
+
+# 状态快照: 版本号、ETag和状态数据，写入时整体发布，发布后不再修改
+StatusSnapshot = namedtuple("StatusSnapshot", ["version", "etag", "data"])
 
 class BearingTemperatureMonitor:
-    """轴承温度监测器，用于分析温度数据并确定告警级别"""
+    """
+    轴承温度监测器，用于分析温度数据并确定告警级别
+    
+    线程安全: 写入(evaluate_temperature)由监测器自己的锁串行化；每次写入结束时
+    发布一个新的只读状态快照，读取方直接取当前快照的引用，不加锁，也不会读到写了一半的状态，
+    因此大量状态查询不会拖慢温度上报。
+    """
     
-    def __init__(self):
+    def __init__(self, bearing_id="default"):
+        self.bearing_id = bearing_id
+        
         # 定义温度阈值（摄氏度）
         self.normal_threshold = 60.0    # 正常温度的上限
         self.warning_threshold = 80.0   # 警告温度的上限
@@ -15,8 +31,8 @@ class BearingTemperatureMonitor:
         self.DANGER = "danger"      # 红灯
         
         # 状态历史记录
-        self.status_history = []
         self.max_history_size = 100
+        self.status_history = deque(maxlen=self.max_history_size)
         self.current_status = self.NORMAL
         
         # 统计信息
@@ -25,16 +41,57 @@ class BearingTemperatureMonitor:
             "min_temperature": float('inf'),
             "avg_temperature": 0.0,
             "total_readings": 0,
-            "normal_count":.0,
+            "normal_count": 0,
             "warning_count": 0,
             "danger_count": 0,
             "last_danger_time": None
         }
+        
+        # 在线趋势检测(温升速率、基线漂移、越限预测)
+        self.trend_detector = TemperatureTrendDetector(
+            thresholds=(self.normal_threshold, self.warning_threshold)
+        )
+        self.alerts = []
+        
+        # 写入锁(每个轴承一个)
+        self._lock = threading.Lock()
+        
+        # 状态版本号，每次evaluate_temperature改变状态时递增，用于响应缓存和ETag
+        self.version = 0
+        self._instance_tag = uuid.uuid4().hex[:12]
+        self._snapshot = self._build_snapshot()
+    
+    @property
+    def etag(self):
+        """当前状态的ETag，包含实例标识以区分进程重启和多个工作进程"""
+        return self._snapshot.etag
     
-    def evaluate_temperature(self, temperature):
-        """评估温度并返回状态"""
-        # 更新统计信息
-        self._update_stats(temperature)
+    def evaluate_temperature(self, temperature, timestamp=None):
+        """
+        评估温度并返回状态
+        
+        参数:
+            temperature: 温度值(摄氏度)
+            timestamp: 采样时间(ISO格式字符串)，边缘侧压缩上报时为原始采样时间，缺省为当前时间
+        """
+        return self.evaluate_reading(temperature, timestamp)["status"]
+    
+    def evaluate_reading(self, temperature, timestamp=None):
+        """
+        评估一条温度读数
+        
+        参数与evaluate_temperature相同
+        
+        返回:
+            本次评估的结果字典(status、sample_time、alerts)，多线程上报时
+            应使用返回值而不是监测器属性，后者可能已被其他线程的写入更新
+        """
+        # 时间解析不涉及共享状态，在锁外完成
+        if timestamp:
+            sample_time = datetime.datetime.fromisoformat(timestamp).timestamp()
+        else:
+            sample_time = time.time()
+            timestamp = datetime.datetime.fromtimestamp(sample_time).isoformat()
         
         # 确定状态
         status = self.NORMAL
@@ -43,29 +100,85 @@ class BearingTemperatureMonitor:
         elif temperature >= self.normal_threshold:
             status = self.WARNING
         
-        # 更新当前状态和历史记录
-        self.current_status = status
-        self.status_history.append({
-            "timestamp": datetime.datetime.now().isoformat(),
-            "temperature": temperature,
-            "status": status
-        })
+        with self._lock:
+            # 更新统计信息
+            self._update_stats(temperature, status, timestamp)
+            
+            # 趋势检测
+            alerts = self.trend_detector.update(sample_time, temperature)
+            self.alerts = alerts
+            
+            # 更新当前状态和历史记录(超出大小的旧记录由deque自动丢弃)
+            self.current_status = status
+            self.status_history.append({
+                "timestamp": timestamp,
+                "temperature": temperature,
+                "status": status
+            })
+            
+            self.version += 1
+            self._snapshot = self._build_snapshot()
+        
+        return {"status": status, "sample_time": sample_time, "alerts": alerts}
+    
+    def restore(self, readings):
+        """
+        用持久化的最近读数恢复状态(服务重启后调用)
         
-        # 限制历史记录大小
-        if len(self.status_history) > self.max_history_size:
-            self.status_history.pop(0)
+        读数按时间顺序重新评估一遍，从而恢复历史记录、当前状态和趋势检测器，
+        恢复过程中产生的告警不保留
         
-        return status
+        参数:
+            readings: [(Unix时间戳, 温度, 状态), ...]，按时间升序
+        """
+        for ts, temperature, _ in readings:
+            self.evaluate_temperature(temperature, datetime.datetime.fromtimestamp(ts).isoformat())
+        with self._lock:
+            self.alerts = []
+            self.version += 1
+            self._snapshot = self._build_snapshot()
+    
+    def _update_stats(self, temperature, status, timestamp):
+        """更新温度统计信息(在写入锁内调用)"""
+        stats = self.stats
+        stats["total_readings"] += 1
+        stats["max_temperature"] = max(stats["max_temperature"], temperature)
+        stats["min_temperature"] = min(stats["min_temperature"], temperature)
+        stats["avg_temperature"] += (temperature - stats["avg_temperature"]) / stats["total_readings"]
+        stats[f"{status}_count"] += 1
+        if status == self.DANGER:
+            stats["last_danger_time"] = timestamp
+    
+    def _build_snapshot(self):
+        """构建当前状态的快照(在写入锁内或构造时调用)，统计信息和历史记录均为副本"""
+        history = self.status_history
+        data = {
+            "bearing_id": self.bearing_id,
+            "status": self.current_status,
+            "stats": dict(self.stats),
+            "trend": self.trend_detector.get_state(),
+            "alerts": self.alerts,
+            "last_readings": [history[i] for i in range(max(len(history) - 10, 0), len(history))]
+        }
+        etag = f"{self.bearing_id}-{self._instance_tag}-{self.version}"
+        return StatusSnapshot(self.version, etag, data)
     
-    def _update_stats(self, temperature):
-        """更新温度统计信息"""
-        # 实现统计逻辑...
-        pass
+    def snapshot(self):
+        """
+        获取当前状态快照(不加锁)
+        
+        快照中的data为所有读取方共享的已发布对象，仅供序列化等只读用途；
+        需要修改状态数据时使用get_current_status获取副本
+        """
+        return self._snapshot
     
     def get_current_status(self):
-        """获取当前状态和相关统计信息"""
+        """获取当前状态和相关统计信息(副本，修改不会影响监测器和其他读取方)"""
+        data = self._snapshot.data
         return {
-            "status": self.current_status,
-            "stats": self.stats,
-            "last_readings": self.status_history[-10:] if self.status_history else []
-        }
\ No newline at end of file
+            **data,
+            "stats": dict(data["stats"]),
+            "trend": dict(data["trend"]),
+            "alerts": [dict(alert) for alert in data["alerts"]],
+            "last_readings": [dict(reading) for reading in data["last_readings"]]
+        }
@@ -0,0 +1,44 @@
+# 快速JSON序列化 - 安装了orjson时替换Flask默认的JSON序列化实现
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用Flask默认实现
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    基于orjson的JSON提供者，序列化结果与默认实现兼容
+    
+    datetime/date交给默认实现的default处理，仍输出RFC 822格式(与默认实现一致)；
+    已知差异: NaN和无穷大输出为null(默认实现输出非标准的NaN/Infinity)。
+    """
+    
+    def _options(self, sort_keys=None):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=self.default,
+                                option=self._options(kwargs.get('sort_keys'))).decode('utf-8')
+        except TypeError:
+            # orjson无法处理的类型(如超大整数)回退到标准库
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj), mimetype=self.mimetype)
+
+
+def init_json(app):
+    """为应用启用快速JSON序列化(orjson可用时)"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    return app.json
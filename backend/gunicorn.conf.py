@@ -0,0 +1,34 @@
+# gunicorn 生产部署配置(在 backend 目录下执行: gunicorn -c gunicorn.conf.py wsgi:app)
+import os
+
+# 监听地址
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# 工作进程数
+# 温度监测状态保存在各进程内存中，多进程时每个进程各自维护一份状态，
+# 写入和查询可能落到不同进程。默认单进程多线程以保证状态一致；
+# 需要横向扩展时请参考 README 中"多进程与共享状态"一节。
+# 不同进程数下的吞吐量用 scripts/loadtest.py 测量，方法和已有结果见 README "压力测试"一节。
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+
+# 每个工作进程的线程数(gthread 工作模式)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# 不预加载应用，确保 create_app 在每个工作进程中执行，
+# 避免后台线程和数据库连接在 fork 之前创建
+preload_app = False
+
+# 超时与连接保持
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# 工作进程定期重启，防止长期运行的内存增长
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = 50
+
+# 日志输出到标准输出/错误
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
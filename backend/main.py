@@ -1,30 +1,66 @@
 # 后端主入口文件
+import os
 from flask import Flask
+from app.models.inspection_system import InspectionSystem
 from app.routes.temperature_routes import temperature_bp
+from app.routes.admin_routes import admin_bp
+from app.services.profiler import RuntimeProfiler
+from app.utils.json_provider import init_json
 # 导入其他路由...
 
-# 创建Flask应用
-app = Flask(__name__)
-
-# 注册蓝图(路由)
-app.register_blueprint(temperature_bp, url_prefix='/api')
-# 注册其他蓝图...
+def create_app(config=None):
+    """
+    应用工厂
+    
+    多进程部署时每个工作进程各调用一次，因此每个进程持有独立的InspectionSystem实例。
+    
+    参数:
+        config: 覆盖默认配置的字典(可选)
+    """
+    # 创建Flask应用
+    app = Flask(__name__)
+    app.config.update(
+        MODEL_PATH=os.environ.get('MODEL_PATH'),
+        DB_PATH=os.environ.get('DB_PATH'),
+    )
+    if config:
+        app.config.update(config)
+    
+    # 启用快速JSON序列化(安装了orjson时)
+    init_json(app)
+    
+    # 注册蓝图(路由)
+    app.register_blueprint(temperature_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    # 注册其他蓝图...
+    
+    # 巡检系统实例(控制器通过 current_app.inspection_system 访问)
+    app.inspection_system = InspectionSystem(
+        model_path=app.config['MODEL_PATH'],
+        db_path=app.config['DB_PATH']
+    )
+    
+    # 运行时剖析器(通过 /api/admin/profile 触发)
+    app.profiler = RuntimeProfiler()
+    
+    app.after_request(after_request)
+    app.add_url_rule('/', 'index', index)
+    
+    return app
 
 # 配置跨域请求(CORS)
-@app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-None-Match')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
+    response.headers.add('Access-Control-Expose-Headers', 'ETag')
     return response
 
 # 主路由
-@app.route('/')
 def index():
     return {"status": "API服务运行正常"}
 
-# 启动服务器
+# 启动开发服务器(生产环境请使用 gunicorn，见 gunicorn.conf.py)
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
-
-
+    app = create_app()
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
@@ -0,0 +1,107 @@
+# 后端压力测试脚本 - 只依赖标准库，用多个长连接线程并发请求，输出吞吐量和延迟分位数
+#
+# 用法(在 backend 目录下，先启动服务):
+#   python scripts/loadtest.py --url http://127.0.0.1:5000/api/bearing-temperature/status -c 32 -d 30
+#   python scripts/loadtest.py --url http://127.0.0.1:5000/api/bearing-temperature/status --etag
+#   python scripts/loadtest.py --url http://127.0.0.1:5000/api/bearing-temperature --post
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+
+def _worker(url, deadline, args, results):
+    """单个并发连接: 在截止时间前循环发送请求，记录每次请求的延迟和状态码"""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    latencies = []
+    codes = {}
+    etag = None
+
+    while time.monotonic() < deadline:
+        headers = {}
+        body = None
+        method = 'GET'
+        if args.post:
+            method = 'POST'
+            body = json.dumps({
+                'temperature': round(random.uniform(40.0, 70.0), 1),
+                'bearing_id': f"B-{random.randrange(args.bearings):03d}"
+            })
+            headers['Content-Type'] = 'application/json'
+        elif args.etag and etag:
+            headers['If-None-Match'] = etag
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            codes['error'] = codes.get('error', 0) + 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+        codes[response.status] = codes.get(response.status, 0) + 1
+        etag = response.getheader('ETag') or etag
+
+    conn.close()
+    results.append((latencies, codes))
+
+
+def run(url, concurrency, duration, args):
+    """并发压测，返回汇总结果"""
+    deadline = time.monotonic() + duration
+    results = []
+    threads = [threading.Thread(target=_worker, args=(url, deadline, args, results))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for result in results for l in result[0])
+    codes = {}
+    for _, result_codes in results:
+        for code, count in result_codes.items():
+            codes[code] = codes.get(code, 0) + count
+
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p99_ms': percentile(0.99),
+        'codes': codes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后端压力测试")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api/bearing-temperature/status')
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help="并发连接数")
+    parser.add_argument('-d', '--duration', type=float, default=30.0, help="持续时间(秒)")
+    parser.add_argument('--etag', action='store_true', help="GET时带上次返回的ETag(测试304路径)")
+    parser.add_argument('--post', action='store_true', help="发送温度上报POST请求")
+    parser.add_argument('--bearings', type=int, default=200, help="POST时随机使用的轴承数")
+    args = parser.parse_args()
+
+    result = run(args.url, args.concurrency, args.duration, args)
+    print(f"请求数 {result['requests']}, 耗时 {result['seconds']:.1f} 秒, 吞吐量 {result['rps']:.0f} 次/秒")
+    print(f"延迟 p50 {result['p50_ms']:.1f} ms, p90 {result['p90_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+    print(f"状态码 {result['codes']}")
+
+
+if __name__ == '__main__':
+    main()
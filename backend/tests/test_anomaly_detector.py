@@ -0,0 +1,92 @@
+# 温度趋势检测器告警锁存测试
+import os
+import sys
+import math
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.anomaly_detector import TemperatureTrendDetector
+
+
+def _alert_counts(trace, **kwargs):
+    """按1 Hz回放温度序列，返回各类告警的次数"""
+    detector = TemperatureTrendDetector(**kwargs)
+    counts = Counter()
+    for t, temperature in enumerate(trace):
+        for alert in detector.update(float(t), temperature):
+            counts[alert["type"]] += 1
+    return counts
+
+
+def _ramp_trace(seed=1):
+    """平稳10分钟后以1°C/分钟升温70分钟，再保持10分钟，叠加0.3°C噪声"""
+    rng = random.Random(seed)
+    trace = []
+    for t in range(5400):
+        rise = min(max(t - 600, 0), 4200) / 60.0
+        trace.append(30.0 + rise + rng.gauss(0.0, 0.3))
+    return trace
+
+
+def test_ramp_fires_each_alert_type_once():
+    counts = _alert_counts(_ramp_trace())
+    assert counts == {
+        "rate_of_rise": 1,
+        "baseline_drift": 1,
+        "predicted_warning": 1,
+        "predicted_danger": 1
+    }
+
+
+def test_alerts_rearm_after_recovery():
+    # 两次升温之间降温并在基线附近平稳运行，每次升温各告警一次
+    rng = random.Random(2)
+    trace = []
+    for t in range(14400):
+        minute = t / 60.0
+        if minute < 10:
+            temperature = 40.0
+        elif minute < 30:
+            temperature = 40.0 + (minute - 10)
+        elif minute < 50:
+            temperature = 60.0 - (minute - 30)
+        elif minute < 200:
+            temperature = 40.0
+        elif minute < 220:
+            temperature = 40.0 + (minute - 200)
+        else:
+            temperature = 60.0
+        trace.append(temperature + rng.gauss(0.0, 0.3))
+
+    counts = _alert_counts(trace)
+    assert counts["rate_of_rise"] == 2
+    assert counts["baseline_drift"] == 2
+    assert counts["predicted_warning"] == 2
+
+
+def test_slow_swing_does_not_flood_baseline_drift():
+    # ±2°C、周期6小时的缓慢波动: 一天内有5个偏高时段，每段告警一次(启动阶段基线未稳定时可能多一次)
+    rng = random.Random(3)
+    trace = [40.0 + 2.0 * math.sin(2 * math.pi * t / 21600) + rng.gauss(0.0, 0.3) for t in range(86400)]
+    counts = _alert_counts(trace)
+    assert 1 <= counts["baseline_drift"] <= 6
+    assert counts["rate_of_rise"] == 0
+
+
+def test_flat_trace_has_no_alerts():
+    rng = random.Random(4)
+    assert _alert_counts([40.0 + rng.gauss(0.0, 0.3) for _ in range(86400)]) == {}
+
+
+def test_cooldown_limits_repeated_alerts():
+    # 快速往复的温度变化: 有冷却时间时同一类告警的间隔不小于冷却时间
+    trace = []
+    for t in range(7200):
+        phase = t % 1200
+        trace.append(40.0 + (phase / 60.0 * 3 if phase < 600 else (1200 - phase) / 60.0 * 3))
+    without = _alert_counts(trace)
+    with_cooldown = _alert_counts(trace, cooldown=3600.0)
+    assert with_cooldown["rate_of_rise"] <= 2
+    assert with_cooldown["rate_of_rise"] < without["rate_of_rise"]
@@ -0,0 +1,110 @@
+# 轴承温度监测器并发读写测试
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.temperature_monitor import BearingTemperatureMonitor
+
+WRITERS = 8
+READINGS_PER_WRITER = 500
+READERS = 4
+
+
+def _check_snapshot(snapshot):
+    """校验一个快照内部的一致性，返回发现的问题列表"""
+    data = snapshot.data
+    stats = data["stats"]
+    problems = []
+    if stats["total_readings"] != snapshot.version:
+        problems.append(f"读数总数 {stats['total_readings']} 与版本号 {snapshot.version} 不一致")
+    if stats["normal_count"] + stats["warning_count"] + stats["danger_count"] != stats["total_readings"]:
+        problems.append(f"各状态计数之和与读数总数不一致: {stats}")
+    if not snapshot.etag.endswith(f"-{snapshot.version}"):
+        problems.append(f"ETag {snapshot.etag} 与版本号 {snapshot.version} 不一致")
+    if len(data["last_readings"]) != min(snapshot.version, 10):
+        problems.append(f"最近读数条数 {len(data['last_readings'])} 与版本号 {snapshot.version} 不一致")
+    if data["last_readings"] and data["last_readings"][-1]["status"] != data["status"]:
+        problems.append("当前状态与最后一条读数的状态不一致")
+    return problems
+
+
+def test_concurrent_writers_and_readers():
+    monitor = BearingTemperatureMonitor("B-stress")
+    writers_done = threading.Event()
+    start = threading.Barrier(WRITERS + READERS)
+    problems = []
+    snapshots_read = [0] * READERS
+
+    def write(worker):
+        start.wait()
+        for i in range(READINGS_PER_WRITER):
+            # 温度在三个状态区间之间轮换
+            monitor.evaluate_temperature(50.0 + (worker * READINGS_PER_WRITER + i) % 40)
+
+    def read(reader):
+        start.wait()
+        last_version = -1
+        while not writers_done.is_set():
+            snapshot = monitor.snapshot()
+            if snapshot.version < last_version:
+                problems.append(f"版本号回退: {last_version} -> {snapshot.version}")
+            last_version = snapshot.version
+            problems.extend(_check_snapshot(snapshot))
+            snapshots_read[reader] += 1
+
+    writer_threads = [threading.Thread(target=write, args=(w,)) for w in range(WRITERS)]
+    reader_threads = [threading.Thread(target=read, args=(r,)) for r in range(READERS)]
+    for thread in writer_threads + reader_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    writers_done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    assert problems == []
+    assert all(count > 0 for count in snapshots_read)
+
+    total = WRITERS * READINGS_PER_WRITER
+    snapshot = monitor.snapshot()
+    stats = snapshot.data["stats"]
+    assert snapshot.version == total
+    assert stats["total_readings"] == total
+    assert stats["normal_count"] + stats["warning_count"] + stats["danger_count"] == total
+    assert len(monitor.status_history) == monitor.max_history_size
+    assert _check_snapshot(snapshot) == []
+
+
+def test_current_status_is_a_copy():
+    monitor = BearingTemperatureMonitor("B-copy")
+    for temperature in (40.0, 65.0, 85.0):
+        monitor.evaluate_temperature(temperature)
+
+    status = monitor.get_current_status()
+    status["status"] = "tampered"
+    status["stats"]["total_readings"] = -1
+    status["trend"]["baseline"] = -1
+    status["last_readings"][0]["temperature"] = -1
+    status["last_readings"].clear()
+
+    snapshot = monitor.snapshot()
+    assert snapshot.data["status"] == monitor.DANGER
+    assert snapshot.data["stats"]["total_readings"] == 3
+    assert snapshot.data["trend"]["baseline"] != -1
+    assert [r["temperature"] for r in snapshot.data["last_readings"]] == [40.0, 65.0, 85.0]
+    assert monitor.get_current_status() == snapshot.data
+
+
+def test_snapshot_is_not_changed_by_later_writes():
+    monitor = BearingTemperatureMonitor("B-publish")
+    monitor.evaluate_temperature(40.0)
+    before = monitor.snapshot()
+    expected = monitor.get_current_status()
+
+    monitor.evaluate_temperature(90.0)
+
+    assert before.data == expected
+    assert monitor.snapshot().version == before.version + 1
+    assert monitor.snapshot().data["status"] == monitor.DANGER
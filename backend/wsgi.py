@@ -0,0 +1,4 @@
+# 生产环境WSGI入口: gunicorn -c gunicorn.conf.py wsgi:app
+from main import create_app
+
+app = create_app()
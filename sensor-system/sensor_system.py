@@ -1,10 +1,15 @@
 # 传感器系统主入口
 import os
+import json
+import signal
 import logging
 import time
-from sensors.temperature_sensor import TemperatureSensor
-from sensors.camera_sensor import CameraSensor
-from sensors.vibration_sensor import VibrationSensor
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from sensors.registry import get_sensor_class, create_sensor
+from sensors.fleet import load_fleet_config, load_fusion_config
+from sensors.profiler import RuntimeProfiler, PROFILE_DIR
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, 
@@ -18,39 +23,237 @@ class SensorManager:
         """初始化传感器管理器"""
         self.sensors = {}
         self.running = False
+        self.profiler = RuntimeProfiler()
+        self.max_workers = 32
+        self.startup_stats = {}
+        
+        # 多传感器融合(可选): 传感器ID -> 托辊ID
+        self.idler_map = {}
+        self.fusion = None
+        self.fusion_interval = 1.0
+        self._fusion_thread = None
         
         logger.info("传感器管理器初始化")
     
-    def add_sensor(self, sensor_type, sensor):
+    def add_sensor(self, sensor_id, sensor):
         """添加传感器"""
-        self.sensors[sensor_type] = sensor
-        logger.info(f"添加传感器: {sensor_type}")
+        self.sensors[sensor_id] = sensor
+        logger.debug(f"添加传感器: {sensor_id}")
+    
+    def load_fleet(self, specs):
+        """
+        按传感器群配置并行创建传感器
+        
+        参数:
+            specs: load_fleet_config返回的传感器配置列表
+        
+        返回:
+            成功创建的传感器数量
+        """
+        start = time.perf_counter()
+        
+        # 先在主线程中导入用到的传感器类，每种类型只导入一次
+        for type_name in sorted({spec['type'] for spec in specs}):
+            get_sensor_class(type_name)
+        imported = time.perf_counter()
+        
+        def build(spec):
+            try:
+                return spec['id'], create_sensor(spec)
+            except Exception as e:
+                logger.error(f"创建传感器 {spec['id']} 失败: {str(e)}")
+                return spec['id'], None
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for sensor_id, sensor in pool.map(build, specs):
+                if sensor is not None:
+                    self.add_sensor(sensor_id, sensor)
+        
+        self.idler_map.update({
+            spec['id']: spec['idler'] for spec in specs
+            if spec.get('idler') is not None and spec['id'] in self.sensors
+        })
+        
+        self.startup_stats['import_seconds'] = imported - start
+        self.startup_stats['construct_seconds'] = time.perf_counter() - imported
+        logger.info(f"创建 {len(self.sensors)}/{len(specs)} 个传感器, "
+                    f"导入 {self.startup_stats['import_seconds']:.3f} 秒, "
+                    f"构造 {self.startup_stats['construct_seconds']:.3f} 秒")
+        return len(self.sensors)
+    
+    def enable_fusion(self, config=None):
+        """
+        启用多传感器融合
+        
+        配置了idler字段的传感器的采集记录由融合线程读取并按托辊写入融合引擎，
+        融合线程每隔interval秒推进一次水位线
+        
+        参数:
+            config: 融合引擎配置字典(fleet配置中的fusion段)，interval为推进间隔(秒)
+        """
+        # 融合引擎依赖numpy，只在启用融合时导入(与传感器模块的延迟导入一致)
+        from sensors.fusion import FusionEngine
+        
+        config = config or {}
+        self.fusion = FusionEngine(config)
+        self.fusion_interval = config.get('interval', 1.0)
+        logger.info(f"启用多传感器融合, {len(set(self.idler_map.values()))} 个托辊, "
+                    f"{len(self.idler_map)} 个传感器")
+        return self.fusion
+    
+    def _fusion_loop(self):
+        """融合线程: 读取各传感器的采集记录写入融合引擎，并定期推进水位线"""
+        while self.running:
+            cycle_start = time.time()
+            for sensor_id, idler_id in self.idler_map.items():
+                sensor = self.sensors.get(sensor_id)
+                if sensor is None:
+                    continue
+                while True:
+                    reading = sensor.get_data()
+                    if reading is None:
+                        break
+                    try:
+                        self.fusion.ingest_reading(idler_id, reading)
+                    except Exception as e:
+                        logger.error(f"融合传感器 {sensor_id} 的数据失败: {str(e)}")
+            
+            try:
+                for idler_id, fused in self.fusion.advance().items():
+                    logger.debug(f"托辊 {idler_id} 健康评分: {float(fused['health'][-1]):.3f}")
+            except Exception as e:
+                logger.error(f"融合计算失败: {str(e)}")
+            
+            time.sleep(max(0.0, self.fusion_interval - (time.time() - cycle_start)))
     
     def start_all_sensors(self):
-        """启动所有传感器"""
+        """启动所有传感器(并行启动，各传感器在自己的采集线程中连接设备)"""
         if self.running:
             logger.warning("传感器管理器已在运行")
             return
         
         logger.info("启动所有传感器")
         self.running = True
+        start = time.perf_counter()
         
-        for sensor_type, sensor in self.sensors.items():
+        def start_one(item):
+            sensor_id, sensor = item
             try:
                 sensor.start()
             except Exception as e:
-                logger.error(f"启动传感器 {sensor_type} 失败: {str(e)}")
+                logger.error(f"启动传感器 {sensor_id} 失败: {str(e)}")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(start_one, self.sensors.items()))
+        
+        self.startup_stats['start_seconds'] = time.perf_counter() - start
+        logger.info(f"所有传感器启动完成, 耗时 {self.startup_stats['start_seconds']:.3f} 秒")
         
-        logger.info("所有传感器启动完成")
+        if self.fusion is not None and self.idler_map:
+            self._fusion_thread = threading.Thread(target=self._fusion_loop, daemon=True)
+            self._fusion_thread.start()
     
     def stop_all_sensors(self):
         """停止所有传感器"""
-        # 实现停止逻辑...
-        pass
+        if not self.running:
+            return
+        
+        def stop_one(item):
+            sensor_id, sensor = item
+            try:
+                sensor.stop()
+            except Exception as e:
+                logger.error(f"停止传感器 {sensor_id} 失败: {str(e)}")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(stop_one, self.sensors.items()))
+        
+        self.running = False
+        if self._fusion_thread is not None:
+            self._fusion_thread.join(timeout=self.fusion_interval + 1.0)
+            self._fusion_thread = None
+        logger.info("所有传感器已停止")
+    
+    def start_profiling(self, mode='stack', duration=10.0, sensor_id=None):
+        """
+        启动限时运行时剖析，结果写入 profiles 目录
+        
+        参数:
+            mode: 'stack'(全进程调用栈采样)、'memory'(tracemalloc快照)
+                  或 'cprofile'(对传感器采集循环启用cProfile)
+            duration: 剖析时长(秒)
+            sensor_id: cprofile模式下的目标传感器ID(必填，进程内同一时间只能剖析一个传感器)
+        
+        返回:
+            是否成功启动
+        """
+        if mode != 'cprofile':
+            return self.profiler.start(mode, duration)
+        
+        if sensor_id is None:
+            logger.error("cprofile模式需要指定传感器ID，同一时间只能剖析一个传感器的采集循环")
+            return False
+        if sensor_id not in self.sensors:
+            logger.error(f"未找到传感器: {sensor_id}")
+            return False
+        if not self.sensors[sensor_id].running:
+            # 采集循环未运行时请求不会被处理，也就不会释放进程内的cProfile会话
+            logger.error(f"传感器 {sensor_id} 未运行，无法剖析采集循环")
+            return False
+        
+        if not self.sensors[sensor_id].profiler.arm(duration, self.profiler.output_dir):
+            return False
+        logger.info(f"已请求对传感器 {sensor_id} 的采集循环进行cProfile剖析, 持续 {duration} 秒")
+        return True
+    
+    def install_profiling_signals(self, request_file='profile_request.json'):
+        """
+        注册剖析信号处理(仅POSIX)
+        
+        SIGUSR1: 读取request_file中的请求(如 {"mode": "cprofile", "sensor": "temp-001",
+                 "duration": 30})，文件不存在时执行10秒调用栈采样
+        SIGUSR2: 执行10秒tracemalloc内存快照
+        """
+        if not hasattr(signal, 'SIGUSR1'):
+            logger.warning("当前平台不支持剖析信号")
+            return
+        
+        def handle_usr1(signum, frame):
+            request = {}
+            if os.path.exists(request_file):
+                try:
+                    with open(request_file, 'r', encoding='utf-8') as f:
+                        request = json.load(f)
+                except Exception as e:
+                    logger.error(f"读取剖析请求失败: {str(e)}")
+                    return
+            self._start_profiling_safely(request.get('mode', 'stack'),
+                                         request.get('duration', 10.0),
+                                         request.get('sensor'))
+        
+        def handle_usr2(signum, frame):
+            self._start_profiling_safely('memory', 10.0)
+        
+        signal.signal(signal.SIGUSR1, handle_usr1)
+        signal.signal(signal.SIGUSR2, handle_usr2)
+        logger.info(f"剖析信号已注册(PID {os.getpid()}), 结果目录: {PROFILE_DIR}")
+    
+    def _start_profiling_safely(self, mode, duration, sensor_id=None):
+        """信号处理中启动剖析，异常只记录日志不向外抛出"""
+        try:
+            self.start_profiling(mode, duration, sensor_id)
+        except Exception as e:
+            logger.error(f"启动剖析失败: {str(e)}")
 
 def main():
     """主程序入口"""
+    parser = argparse.ArgumentParser(description="带式输送机托辊故障检测系统 - 传感器端")
+    parser.add_argument('--config', default=os.environ.get('SENSOR_FLEET_CONFIG'),
+                        help="传感器群配置文件(JSON/YAML)，默认使用内置的两个模拟传感器")
+    args = parser.parse_args()
+    
     try:
+        startup_begin = time.perf_counter()
         print("\n" + "="*80)
         print("    带式输送机托辊故障检测系统 - 传感器端")
         print("="*80 + "\n")
@@ -58,26 +261,18 @@ def main():
         # 初始化传感器管理器
         manager = SensorManager()
         
-        # 创建并添加传感器
-        temp_sensor = TemperatureSensor({
-            'device_id': '/dev/ttyUSB0',
-            'sampling_rate': 1,
-            'simulate': True
-        })
-        manager.add_sensor('temperature', temp_sensor)
-        
-        camera_sensor = CameraSensor({
-            'device_id': 0,
-            'resolution': (640, 480),
-            'fps': 15,
-            'simulate': True
-        })
-        manager.add_sensor('camera', camera_sensor)
-        
-        # 添加其他传感器...
+        # 按配置创建传感器
+        manager.load_fleet(load_fleet_config(args.config))
+        fusion_config = load_fusion_config(args.config)
+        if fusion_config is not None:
+            manager.enable_fusion(fusion_config)
         
         # 启动所有传感器
         manager.start_all_sensors()
+        logger.info(f"传感器端启动总耗时 {time.perf_counter() - startup_begin:.3f} 秒")
+        
+        # 注册运行时剖析信号
+        manager.install_profiling_signals()
         
         print("\n所有传感器已启动，按 Ctrl+C 停止系统")
         
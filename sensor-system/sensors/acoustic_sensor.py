@@ -0,0 +1,250 @@
+# 声学传感器实现
+import wave
+import logging
+import numpy as np
+from .base_sensor import BaseSensor, SensorType
+
+logger = logging.getLogger("AcousticSensor")
+
+class AcousticSensor(BaseSensor):
+    """声学传感器，按块采集音频并提取频带能量、谱峭度和包络谱特征，用于发现卡死托辊"""
+
+    def __init__(self, config):
+        super().__init__(SensorType.ACOUSTIC, config)
+        self.sample_rate = config.get('sample_rate', 48000)  # Hz
+        self.block_size = config.get('block_size', 4096)     # 每块采样点数
+        self.channels = config.get('channels', 1)
+        self.wav_file = config.get('wav_file')               # 模拟模式下回放的WAV文件
+        self.stream = None
+        self.wav = None
+
+        # 特征参数
+        self.bands = config.get('bands', [
+            (20, 250), (250, 500), (500, 1000), (1000, 2000),
+            (2000, 4000), (4000, 8000), (8000, 16000)
+        ])
+        self.envelope_band = config.get('envelope_band', (2000, 10000))  # 包络解调频带(Hz)
+        self.kurtosis_alpha = config.get('kurtosis_alpha', 0.05)         # 谱峭度滑动平均系数
+        self.top_k = config.get('top_k', 5)                              # 包络谱峰值个数
+
+        # 模拟模式按块时长控制节奏，实际设备由阻塞读取控制节奏
+        if self.simulate:
+            self.sampling_interval = self.block_size / self.sample_rate
+
+        self._prepare_buffers()
+
+    def _prepare_buffers(self):
+        """预分配各块计算共用的窗函数、频带索引和中间缓冲区"""
+        n = self.block_size
+        self.freqs = np.fft.rfftfreq(n, 1.0 / self.sample_rate)
+        self.window = np.hanning(n).astype(np.float32)
+        self._windowed = np.empty((self.channels, n), dtype=np.float32)
+        self._power = np.empty((self.channels, len(self.freqs)), dtype=np.float64)
+
+        # 频带边界对应的频点索引，配合reduceat一次求出所有频带的能量
+        nyquist = self.sample_rate / 2
+        self.bands = [(lo, min(hi, nyquist)) for lo, hi in self.bands if lo < nyquist]
+        edges = np.searchsorted(self.freqs, [b for band in self.bands for b in band])
+        self._band_starts = edges[0::2]
+        self._band_ends = np.maximum(edges[1::2], self._band_starts + 1)
+        self._band_index = np.ravel([self._band_starts, self._band_ends], order='F')
+        self._cumulative = np.zeros((self.channels, len(self.freqs) + 1))
+
+        # 谱峭度的滑动二阶、四阶矩(谱峭度缓冲区多一列，使频带结束索引可以取到奈奎斯特频点之后)
+        self._m2 = np.zeros((self.channels, len(self.freqs)))
+        self._m4 = np.zeros((self.channels, len(self.freqs)))
+        self._kurtosis = np.zeros((self.channels, len(self.freqs) + 1))
+        self._blocks = 0
+
+        # 包络解调: 带通掩码(含解析信号的正频率加倍)和复数全谱缓冲区
+        lo, hi = self.envelope_band
+        self._envelope_gain = np.where((self.freqs >= lo) & (self.freqs <= hi), 2.0, 0.0)
+        self._analytic = np.zeros((self.channels, n), dtype=np.complex128)
+        self.envelope_freqs = np.fft.rfftfreq(n, 1.0 / self.sample_rate)
+
+        # 模拟信号的时间基准
+        self._t = np.arange(n) / self.sample_rate
+        self._sim_offset = 0
+
+    def _connect(self):
+        """连接到音频设备或打开WAV文件"""
+        try:
+            if self.simulate:
+                if self.wav_file:
+                    self.wav = wave.open(self.wav_file, 'rb')
+                    if self.wav.getframerate() != self.sample_rate or self.wav.getnchannels() != self.channels:
+                        logger.error(f"WAV文件格式与配置不符: {self.wav.getframerate()} Hz, {self.wav.getnchannels()} 通道")
+                        return False
+                    logger.info(f"使用WAV文件模拟声学数据: {self.wav_file}")
+                else:
+                    logger.info("使用模拟声学传感器数据")
+                return True
+
+            # 连接到实际音频采集设备(sounddevice为可选依赖，仅在使用实际设备时导入)
+            import sounddevice as sd
+            self.stream = sd.InputStream(
+                device=self.device_id,
+                samplerate=self.sample_rate,
+                blocksize=self.block_size,
+                channels=self.channels,
+                dtype='float32'
+            )
+            self.stream.start()
+
+            logger.info(f"声学传感器连接成功: {self.device_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"声学传感器连接失败: {str(e)}")
+            return False
+
+    def _disconnect(self):
+        """断开与音频设备的连接"""
+        try:
+            if self.stream is not None:
+                self.stream.stop()
+                self.stream.close()
+                self.stream = None
+                logger.info("声学传感器已断开连接")
+            if self.wav is not None:
+                self.wav.close()
+                self.wav = None
+        except Exception as e:
+            logger.error(f"断开声学传感器连接时出错: {str(e)}")
+
+    def _read(self):
+        """读取一块音频数据并提取特征"""
+        if self.simulate:
+            return self._simulate_reading()
+
+        if self.stream is None:
+            raise Exception("声学传感器未连接")
+
+        block, overflowed = self.stream.read(self.block_size)
+        if overflowed:
+            logger.warning("声学传感器输入缓冲区溢出，部分音频丢失")
+
+        features = self._extract_features(block.T)
+        features['overflowed'] = bool(overflowed)
+        return features
+
+    def _simulate_reading(self):
+        """模拟声学数据(优先回放WAV文件)"""
+        if self.wav is not None:
+            block = self._read_wav_block()
+        else:
+            block = self._synthesize_block()
+
+        features = self._extract_features(block)
+        features['simulated'] = True
+        return features
+
+    def _read_wav_block(self):
+        """从WAV文件读取一块数据，文件结束后从头循环(文件短于一块时循环拼接)"""
+        width = self.wav.getsampwidth()
+        block_bytes = self.block_size * self.channels * width
+        chunks = []
+        remaining = block_bytes
+        while remaining > 0:
+            frames = self.wav.readframes(remaining // (self.channels * width))
+            if not frames:
+                if self.wav.getnframes() == 0:
+                    raise Exception("WAV文件不包含音频数据")
+                self.wav.rewind()
+                continue
+            chunks.append(frames)
+            remaining -= len(frames)
+        frames = b''.join(chunks)
+
+        if width == 2:
+            samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+        elif width == 4:
+            samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+        elif width == 1:
+            samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        else:
+            raise Exception(f"不支持的WAV采样位宽: {width}")
+
+        # WAV为交错存储，转换为(通道, 采样点)
+        return samples.reshape(-1, self.channels).T
+
+    def _synthesize_block(self):
+        """生成模拟音频块: 背景噪声 + 托辊旋转噪声，偶发轴承冲击"""
+        t = self._t + self._sim_offset / self.sample_rate
+        self._sim_offset += self.block_size
+
+        block = np.random.normal(0.0, 0.02, (self.channels, self.block_size)).astype(np.float32)
+        block += (0.05 * np.sin(2 * np.pi * 120.0 * t)).astype(np.float32)
+
+        # 约每200块出现一次轴承冲击: 以故障频率重复的高频衰减振荡
+        if np.random.random() < 0.005:
+            fault_freq = 85.4
+            phase = (t * fault_freq) % 1.0
+            impulses = np.exp(-phase * 40.0) * np.sin(2 * np.pi * 4000.0 * t)
+            block += (0.3 * impulses).astype(np.float32)
+            logger.info("模拟声学异常: 轴承冲击")
+
+        return block
+
+    def _extract_features(self, block):
+        """
+        提取一块音频的紧凑特征
+
+        参数:
+            block: (通道, 采样点)形状的数组
+
+        返回:
+            特征字典(不包含原始音频)
+        """
+        np.multiply(block, self.window, out=self._windowed)
+        spectrum = np.fft.rfft(self._windowed, axis=-1)
+        np.square(np.abs(spectrum), out=self._power)
+
+        # 时域统计
+        rms = np.sqrt(np.mean(np.square(block, dtype=np.float64), axis=-1))
+        peak = np.max(np.abs(block), axis=-1)
+
+        # 频带能量: 累积和相减，一次求出所有频带
+        np.cumsum(self._power, axis=-1, out=self._cumulative[:, 1:])
+        band_energy = self._cumulative[:, self._band_ends] - self._cumulative[:, self._band_starts]
+
+        # 谱峭度: SK(f) = E|X|^4 / (E|X|^2)^2 - 2，按块滑动平均，每个频带取最大值
+        a = self.kurtosis_alpha if self._blocks else 1.0
+        self._m2 *= 1.0 - a
+        self._m2 += a * self._power
+        self._m4 *= 1.0 - a
+        self._m4 += a * np.square(self._power)
+        self._blocks += 1
+        np.divide(self._m4, np.maximum(np.square(self._m2), 1e-30), out=self._kurtosis[:, :-1])
+        self._kurtosis[:, :-1] -= 2.0
+        band_kurtosis = np.maximum.reduceat(self._kurtosis, self._band_index, axis=-1)[:, 0::2]
+
+        # 包络谱: 带通后构造解析信号，取模得到包络，再对包络做FFT
+        half = len(self.freqs)
+        self._analytic[:, :half] = spectrum * self._envelope_gain
+        envelope = np.abs(np.fft.ifft(self._analytic, axis=-1))
+        envelope -= envelope.mean(axis=-1, keepdims=True)
+        envelope_spectrum = np.abs(np.fft.rfft(envelope, axis=-1)) / self.block_size
+        envelope_spectrum[:, 0] = 0.0
+
+        k = min(self.top_k, envelope_spectrum.shape[-1] - 1)
+        top = np.argpartition(envelope_spectrum, -k, axis=-1)[:, -k:]
+        envelope_peaks = []
+        for ch in range(self.channels):
+            idx = top[ch][np.argsort(envelope_spectrum[ch, top[ch]])[::-1]]
+            envelope_peaks.append([
+                {'frequency': float(self.envelope_freqs[i]), 'amplitude': float(envelope_spectrum[ch, i])}
+                for i in idx
+            ])
+
+        return {
+            'sample_rate': self.sample_rate,
+            'block_size': self.block_size,
+            'rms': rms.tolist(),
+            'peak': peak.tolist(),
+            'crest_factor': (peak / np.maximum(rms, 1e-12)).tolist(),
+            'bands': self.bands,
+            'band_energy': band_energy.tolist(),
+            'band_kurtosis': band_kurtosis.tolist(),
+            'envelope_peaks': envelope_peaks
+        }
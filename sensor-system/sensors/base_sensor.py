@@ -1,5 +1,8 @@
 # 传感器基类和公共定义
 import os
+import re
+import json
+import base64
 import time
 import datetime
 import logging
@@ -7,6 +10,7 @@ import queue
 import threading
 from abc import ABC, abstractmethod
 from enum import Enum
+from .profiler import ScopedProfiler
 
 # 传感器类型枚举
 class SensorType(Enum):
@@ -25,6 +29,14 @@ class SensorStatus(Enum):
     CALIBRATING = 3    # 校准中
     WARMING_UP = 4     # 预热中
 
+def _json_default(value):
+    """将numpy数组/标量、二进制数据等无法直接序列化的值转换为JSON类型"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    return str(value)
+
 class BaseSensor(ABC):
     """传感器基类，定义所有传感器的通用接口"""
     
@@ -48,9 +60,18 @@ class BaseSensor(ABC):
         self.running = False
         self.thread = None
         
-        # 创建传感器存储目录
+        # 采集线程内的cProfile剖析器(按需启用)
+        self.profiler = ScopedProfiler(f"cprofile_{self.sensor_type.name.lower()}_{self.device_id}")
+        
+        # 传感器存储目录(由保存数据的逻辑按需创建，避免每个实例构造时访问文件系统)
         self.data_dir = os.path.join('sensor_data', self.sensor_type.name.lower())
-        os.makedirs(self.data_dir, exist_ok=True)
+        
+        # 本地保存(可选): 每个设备每天一个JSONL文件，供历史回放使用
+        self.save_local = config.get('save_local', False)
+        self.save_flush_interval = config.get('save_flush_interval', 1.0)  # 缓冲数据写入磁盘的最长间隔(秒)
+        self._save_file = None
+        self._save_day = None
+        self._save_flushed = 0.0
         
         logging.info(f"初始化 {self.sensor_type.name} 传感器, ID: {self.device_id}")
     
@@ -112,6 +133,9 @@ class BaseSensor(ABC):
             self.status = SensorStatus.ONLINE
             
             while self.running:
+                # 处理运行时剖析请求
+                self.profiler.poll()
+                
                 try:
                     # 读取传感器数据
                     if self.simulate:
@@ -161,13 +185,46 @@ class BaseSensor(ABC):
             self.status = SensorStatus.ERROR
         
         finally:
+            self.profiler.finish()
+            self._close_save_file()
             self._disconnect()
             self.status = SensorStatus.OFFLINE
     
     def _save_reading(self, reading):
-        """保存传感器数据到本地"""
-        # 实现本地存储逻辑...
-        pass
+        """
+        保存传感器数据到本地
+        
+        按天追加写入 sensor_data/<类型>/<设备ID>_<YYYYMMDD>.jsonl，每行一条读数，
+        文件句柄在采集线程内保持打开，日期变化时切换文件；
+        写入经过缓冲，每隔save_flush_interval秒刷新一次，进程异常退出时最多丢失这段时间的数据
+        """
+        if not self.save_local:
+            return
+        
+        try:
+            day = reading['timestamp'][:10].replace('-', '')
+            if day != self._save_day:
+                self._close_save_file()
+                os.makedirs(self.data_dir, exist_ok=True)
+                device = re.sub(r'[^\w.-]', '_', str(self.device_id))
+                path = os.path.join(self.data_dir, f"{device}_{day}.jsonl")
+                self._save_file = open(path, 'a', encoding='utf-8')
+                self._save_day = day
+            
+            self._save_file.write(json.dumps(reading, ensure_ascii=False, default=_json_default) + '\n')
+            now = time.monotonic()
+            if now - self._save_flushed >= self.save_flush_interval:
+                self._save_file.flush()
+                self._save_flushed = now
+        except Exception as e:
+            logging.error(f"{self.sensor_type.name} 传感器保存数据失败: {str(e)}")
+    
+    def _close_save_file(self):
+        """关闭本地数据文件"""
+        if self._save_file is not None:
+            self._save_file.close()
+            self._save_file = None
+            self._save_day = None
     
     @abstractmethod
     def _connect(self):
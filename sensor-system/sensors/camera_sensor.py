@@ -1,7 +1,5 @@
 # 摄像头传感器实现
 import os
-import cv2
-import numpy as np
 import time
 import random
 import logging
@@ -26,7 +24,8 @@ class CameraSensor(BaseSensor):
                 logger.info("使用模拟摄像头数据")
                 return True
                 
-            # 连接到实际摄像头
+            # 连接到实际摄像头(仅在使用实际设备时导入OpenCV)
+            import cv2
             self.cap = cv2.VideoCapture(self.device_id)
             
             # 设置分辨率
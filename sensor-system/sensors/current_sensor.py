@@ -0,0 +1,231 @@
+# 电流传感器实现
+import logging
+import numpy as np
+from .base_sensor import BaseSensor, SensorType
+
+logger = logging.getLogger("CurrentSensor")
+
+class CurrentSensor(BaseSensor):
+    """电流传感器，对驱动电机电流做电流特征分析(MCSA)，检测转子断条、偏心等故障"""
+
+    def __init__(self, config):
+        super().__init__(SensorType.CURRENT, config)
+        self.sample_rate = config.get('sample_rate', 5000)  # Hz
+        self.block_size = config.get('block_size', 1000)    # 每次读取的采样点数(即分析步长)
+        self.fft_size = config.get('fft_size', 16384)       # FFT窗口长度，决定频率分辨率
+        self.rms_window = config.get('rms_window', 5)       # RMS/峰值因子滑动窗口(块数)
+        self.serial_port = None
+
+        # 电网频率搜索范围和边频带搜索范围(Hz)
+        self.line_frequency = config.get('line_frequency', 50.0)
+        self.line_search = config.get('line_search', 5.0)
+        self.sideband_range = config.get('sideband_range', (0.5, 5.0))
+        self.sideband_threshold = config.get('sideband_threshold', -45.0)  # 边频相对基波的最低dB，低于该值视为噪声
+        self.rotor_frequency = config.get('rotor_frequency')  # 已知转子频率时额外检测偏心边频
+
+        # 串口参数(ADC以小端int16连续输出采样值)
+        self.baud_rate = config.get('params', {}).get('baud_rate', 921600)
+        self.scale = config.get('params', {}).get('scale', 0.01)  # 采样值到安培的换算系数
+
+        if self.simulate:
+            self.sampling_interval = self.block_size / self.sample_rate
+
+        self._prepare_buffers()
+
+    def _prepare_buffers(self):
+        """预分配FFT环形缓冲区、窗函数和滑动窗口统计量"""
+        n = self.fft_size
+        # 双倍长度环形缓冲区: 每个采样同时写入pos和pos+n，任意时刻[pos, pos+n)都是连续的最新窗口
+        self._ring = np.zeros(2 * n)
+        self._pos = 0
+        self._filled = 0
+        self.window = np.hanning(n)
+        self._window_gain = self.window.sum() / 2.0
+        self._windowed = np.empty(n)
+        self.freqs = np.fft.rfftfreq(n, 1.0 / self.sample_rate)
+        self.resolution = self.sample_rate / n
+
+        # 滑动窗口内每块的平方和与绝对值最大值，总平方和增量维护
+        self._block_sumsq = np.zeros(self.rms_window)
+        self._block_peak = np.zeros(self.rms_window)
+        self._block_index = 0
+        self._blocks = 0
+        self._sumsq_total = 0.0
+
+        # 模拟信号的时间基准
+        self._t = np.arange(self.block_size) / self.sample_rate
+        self._sim_offset = 0
+
+    def _connect(self):
+        """连接到电流采集模块"""
+        try:
+            if self.simulate:
+                logger.info("使用模拟电流传感器数据")
+                return True
+
+            # 仅在连接实际设备时导入pyserial
+            import serial
+            self.serial_port = serial.Serial(port=self.device_id, baudrate=self.baud_rate, timeout=1)
+
+            logger.info(f"电流传感器连接成功: {self.device_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"电流传感器连接失败: {str(e)}")
+            return False
+
+    def _disconnect(self):
+        """断开与电流采集模块的连接"""
+        if self.serial_port and not self.simulate:
+            try:
+                self.serial_port.close()
+                self.serial_port = None
+                logger.info("电流传感器已断开连接")
+            except Exception as e:
+                logger.error(f"断开电流传感器连接时出错: {str(e)}")
+
+    def _read(self):
+        """读取一块电流采样并更新特征"""
+        if self.simulate:
+            return self._simulate_reading()
+
+        if not self.serial_port:
+            raise Exception("电流传感器未连接")
+
+        raw = self.serial_port.read(self.block_size * 2)
+        if len(raw) < self.block_size * 2:
+            raise Exception(f"电流数据不完整: {len(raw)} 字节")
+
+        block = np.frombuffer(raw, dtype='<i2') * self.scale
+        return self._process_block(block)
+
+    def _simulate_reading(self):
+        """模拟电机电流: 基波 + 谐波 + 噪声，周期性出现转子断条边频"""
+        t = self._t + self._sim_offset / self.sample_rate
+        self._sim_offset += self.block_size
+
+        f = self.line_frequency
+        block = 10.0 * np.sin(2 * np.pi * f * t)
+        block += 0.5 * np.sin(2 * np.pi * 5 * f * t)
+        block += np.random.normal(0.0, 0.05, self.block_size)
+
+        # 每分钟最后15秒模拟转子断条: f(1±2s)处出现边频，转差率取2%
+        if self._sim_offset // self.sample_rate % 60 >= 45:
+            slip = 0.02
+            block += 0.3 * np.sin(2 * np.pi * f * (1 - 2 * slip) * t)
+            block += 0.2 * np.sin(2 * np.pi * f * (1 + 2 * slip) * t)
+
+        features = self._process_block(block)
+        if features is not None:
+            features['simulated'] = True
+        return features
+
+    def _process_block(self, block):
+        """
+        写入一块采样并计算当前窗口的特征
+
+        返回:
+            特征字典，FFT窗口尚未填满时返回None
+        """
+        n = self.fft_size
+        m = len(block)
+        self._update_amplitude_stats(block)
+
+        # 写入双倍长度环形缓冲区(块长度不超过窗口长度)
+        if m > n:
+            block = block[-n:]
+            m = n
+        first = min(m, n - self._pos)
+        for offset in (0, n):
+            self._ring[offset + self._pos:offset + self._pos + first] = block[:first]
+            self._ring[offset:offset + m - first] = block[first:]
+        self._pos = (self._pos + m) % n
+        self._filled = min(self._filled + m, n)
+
+        if self._filled < n:
+            return None
+
+        return self._analyze()
+
+    def _update_amplitude_stats(self, block):
+        """增量更新滑动窗口RMS和峰值: 新块加入总平方和，最旧的块移出"""
+        sumsq = float(np.dot(block, block))
+        i = self._block_index
+        self._sumsq_total += sumsq - self._block_sumsq[i]
+        self._block_sumsq[i] = sumsq
+        self._block_peak[i] = float(np.max(np.abs(block)))
+        self._block_index = (i + 1) % self.rms_window
+        self._blocks = min(self._blocks + 1, self.rms_window)
+        self._samples_per_block = len(block)
+
+    def _analyze(self):
+        """对最新FFT窗口做MCSA分析"""
+        n = self.fft_size
+        np.multiply(self._ring[self._pos:self._pos + n], self.window, out=self._windowed)
+        amplitude = np.abs(np.fft.rfft(self._windowed)) / self._window_gain
+
+        # 基波: 在额定电网频率附近找峰值，抛物线插值修正频率
+        line_freq, line_amp = self._find_peak(amplitude, self.line_frequency - self.line_search,
+                                              self.line_frequency + self.line_search)
+
+        # 转子断条边频: 在基波两侧搜索最大峰值，以相对基波的dB表示
+        # 搜索起点至少离开基波4个频点，避开汉宁窗主瓣泄漏
+        lo, hi = self.sideband_range
+        lo = max(lo, 4 * self.resolution)
+        sidebands = {
+            'lower': self._sideband(amplitude, line_freq - hi, line_freq - lo, line_amp),
+            'upper': self._sideband(amplitude, line_freq + lo, line_freq + hi, line_amp)
+        }
+        if self.rotor_frequency:
+            fr = self.rotor_frequency
+            sidebands['eccentricity_lower'] = self._sideband(amplitude, line_freq - fr - 0.5,
+                                                             line_freq - fr + 0.5, line_amp)
+            sidebands['eccentricity_upper'] = self._sideband(amplitude, line_freq + fr - 0.5,
+                                                             line_freq + fr + 0.5, line_amp)
+
+        # 滑动窗口RMS和峰值因子
+        rms = float(self._sumsq_total / (self._blocks * self._samples_per_block)) ** 0.5
+        peak = float(self._block_peak[:self._blocks].max())
+
+        return {
+            'rms': rms,
+            'peak': peak,
+            'crest_factor': peak / rms if rms > 0 else 0.0,
+            'unit': 'A',
+            'sample_rate': self.sample_rate,
+            'resolution': self.resolution,
+            'line_frequency': line_freq,
+            'line_amplitude': line_amp,
+            'sidebands': sidebands,
+            'slip_estimate': self._estimate_slip(sidebands, line_freq)
+        }
+
+    def _find_peak(self, amplitude, f_lo, f_hi):
+        """在[f_lo, f_hi]内寻找峰值，返回(插值频率, 幅值)"""
+        i0 = max(int(np.searchsorted(self.freqs, f_lo)), 1)
+        i1 = min(int(np.searchsorted(self.freqs, f_hi)), len(self.freqs) - 1)
+        if i1 <= i0:
+            return float(f_lo), 0.0
+
+        k = i0 + int(np.argmax(amplitude[i0:i1]))
+        a, b, c = amplitude[k - 1], amplitude[k], amplitude[k + 1]
+        denom = a - 2 * b + c
+        delta = 0.5 * (a - c) / denom if denom != 0 else 0.0
+        return float(self.freqs[k] + delta * self.resolution), float(b)
+
+    def _sideband(self, amplitude, f_lo, f_hi, reference):
+        """搜索边频峰值，返回频率和相对基波的dB值"""
+        freq, amp = self._find_peak(amplitude, f_lo, f_hi)
+        db = 20 * np.log10(max(amp, 1e-12) / max(reference, 1e-12))
+        return {'frequency': freq, 'amplitude': amp, 'db': float(db)}
+
+    def _estimate_slip(self, sidebands, line_freq):
+        """
+        根据转子断条边频间距估算转差率: f_sb = f(1 ± 2s)
+        
+        两侧边频都不低于sideband_threshold时才估算，否则边频只是噪声峰值，返回None
+        """
+        if line_freq <= 0 or min(sidebands['lower']['db'], sidebands['upper']['db']) < self.sideband_threshold:
+            return None
+        spacing = (sidebands['upper']['frequency'] - sidebands['lower']['frequency']) / 2
+        return spacing / (2 * line_freq)
@@ -0,0 +1,100 @@
+# 传感器群配置 - 从JSON/YAML文件加载传感器列表
+import os
+import re
+import json
+
+# 序号占位符: {i} 或带格式说明的 {i:03d}，其他花括号原样保留
+_INDEX_PATTERN = re.compile(r'\{i(?::([^{}]*))?\}')
+
+# 未提供配置文件时使用的默认传感器群(与早期版本硬编码的传感器一致)
+DEFAULT_FLEET = {
+    'sensors': [
+        {
+            'id': 'temperature',
+            'type': 'temperature',
+            'device_id': '/dev/ttyUSB0',
+            'sampling_rate': 1,
+            'simulate': True
+        },
+        {
+            'id': 'camera',
+            'type': 'camera',
+            'device_id': 0,
+            'resolution': (640, 480),
+            'fps': 15,
+            'simulate': True
+        }
+    ]
+}
+
+def load_fleet_config(path=None):
+    """
+    加载传感器群配置
+    
+    配置格式:
+        defaults: 所有传感器共用的默认配置(可选)
+        sensors:  传感器列表，每项至少包含 id 和 type；
+                  带 count 字段的条目会展开为多个传感器，字符串字段中的 {i}(或 {i:03d} 等)
+                  替换为序号，其他花括号原样保留；
+                  可选的 idler 字段指定传感器所属托辊，用于多传感器融合
+        fusion:   融合引擎配置(可选)，见load_fusion_config
+    
+    参数:
+        path: 配置文件路径(.json/.yaml/.yml)，为None时返回默认配置
+    
+    返回:
+        展开后的传感器配置列表
+    """
+    config = _read_config(path)
+    defaults = config.get('defaults', {})
+    specs = []
+    for entry in config.get('sensors', []):
+        for spec in _expand(entry):
+            merged = dict(defaults)
+            merged.update(spec)
+            if 'type' not in merged:
+                raise ValueError(f"传感器配置缺少type字段: {merged}")
+            merged.setdefault('id', f"{merged['type']}-{len(specs)}")
+            specs.append(merged)
+    
+    ids = [spec['id'] for spec in specs]
+    if len(ids) != len(set(ids)):
+        raise ValueError("传感器ID重复")
+    return specs
+
+def load_fusion_config(path=None):
+    """
+    加载融合引擎配置(传感器群配置文件中的fusion段)
+    
+    返回:
+        FusionEngine的配置字典；配置文件中没有fusion段时返回None，表示不启用融合
+    """
+    return _read_config(path).get('fusion')
+
+def _read_config(path):
+    """读取配置文件(.json/.yaml/.yml)，为None时返回默认配置"""
+    if path is None:
+        return DEFAULT_FLEET
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            # PyYAML只在使用YAML配置时导入
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def _expand(entry):
+    """展开带count字段的条目"""
+    count = entry.get('count')
+    if count is None:
+        return [entry]
+    
+    start = entry.get('start', 1)
+    specs = []
+    for i in range(start, start + count):
+        spec = {
+            key: _INDEX_PATTERN.sub(lambda m: format(i, m.group(1) or ''), value)
+            if isinstance(value, str) else value
+            for key, value in entry.items() if key not in ('count', 'start')
+        }
+        specs.append(spec)
+    return specs
@@ -0,0 +1,396 @@
+# 多传感器融合引擎 - 按托辊对齐温度、振动和转速数据流并增量计算综合健康评分
+import base64
+import datetime
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger("FusionEngine")
+
+# 各数据流在融合时间格上的聚合方式
+# last: 取格点时刻之前最近的一个值(asof连接)
+# max:  取格点所在区间内的最大值(高采样率流，避免漏掉峰值)
+STREAM_AGGREGATION = {
+    'temperature': 'last',
+    'vibration': 'max',
+    'speed': 'last'
+}
+
+# 默认轴承外圈故障特征频率(Hz)，与VibrationSensor.fault_frequencies保持一致
+DEFAULT_BPFO_FREQUENCIES = [85.4, 103.6, 128.9]
+
+
+class StreamBuffer:
+    """
+    单个数据流的有界缓冲区
+
+    时间戳和数值存放在预分配的连续数组中，空间不足时整体前移(摊还O(1))，
+    始终可以直接对有序时间戳数组做searchsorted。
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.ts = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.head = 0
+        self.tail = 0
+        self.sorted = True
+        self.max_ts = -np.inf
+        self.overflow_dropped = 0
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def append(self, ts, values):
+        """追加一批数据(ts和values为等长的一维数组)"""
+        n = len(ts)
+        if n == 0:
+            return
+        if n > self.capacity:
+            self.overflow_dropped += n - self.capacity
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+            n = self.capacity
+
+        if self.tail + n > self.capacity:
+            self._compact()
+            overflow = self.tail + n - self.capacity
+            if overflow > 0:
+                # 缓冲区已满，丢弃最旧的数据
+                self.head += overflow
+                self.overflow_dropped += overflow
+                self._compact()
+
+        if (self.tail > self.head and ts[0] < self.ts[self.tail - 1]) or \
+                (n > 1 and np.any(ts[1:] < ts[:-1])):
+            self.sorted = False
+
+        self.ts[self.tail:self.tail + n] = ts
+        self.values[self.tail:self.tail + n] = values
+        self.tail += n
+        self.max_ts = max(self.max_ts, float(ts.max()))
+
+    def _compact(self):
+        """将有效数据移动到数组开头"""
+        if self.head == 0:
+            return
+        n = len(self)
+        self.ts[:n] = self.ts[self.head:self.tail]
+        self.values[:n] = self.values[self.head:self.tail]
+        self.head = 0
+        self.tail = n
+
+    def view(self):
+        """返回按时间排序的(时间戳, 数值)视图"""
+        ts = self.ts[self.head:self.tail]
+        values = self.values[self.head:self.tail]
+        if not self.sorted:
+            order = np.argsort(ts, kind='stable')
+            ts[:] = ts[order]
+            values[:] = values[order]
+            self.sorted = True
+        return ts, values
+
+    def evict_before(self, t):
+        """丢弃早于t的数据，保留t之前的最后一个点供asof连接使用"""
+        ts, _ = self.view()
+        keep_from = int(np.searchsorted(ts, t, side='left')) - 1
+        if keep_from > 0:
+            self.head += keep_from
+
+
+class IdlerState:
+    """单个托辊的融合状态"""
+
+    def __init__(self, idler_id):
+        self.idler_id = idler_id
+        self.streams = {}
+        self.watermark = -np.inf
+        self.last_emitted = None
+        self.temp_baseline = None
+        self.late_dropped = 0
+        self.latest = None
+        self.lock = threading.Lock()
+
+
+class FusionEngine:
+    """
+    多传感器融合引擎
+
+    每个托辊的温度、振动(BPFO峰值幅值)、转速数据流分别进入有界缓冲区，
+    以"各流最新时间戳的最小值减去允许迟到时间"作为水位线；水位线推进后，
+    在固定步长的时间格上对各流做向量化连接，并增量计算综合健康评分。
+    落在已输出时间格之前的数据视为迟到数据直接丢弃。
+    """
+
+    def __init__(self, config=None):
+        """
+        初始化融合引擎
+
+        参数:
+            config: 配置字典(可选)
+                step: 融合时间格步长(秒)
+                allowed_lateness: 允许迟到时间(秒)
+                idle_timeout: 数据流超过该时间无数据时不再参与水位线计算(秒)
+                buffer_capacity: 每个数据流缓冲区容量(点数)
+                tolerance: last聚合时允许的最大时间差(秒)
+                bpfo_frequencies: 用于提取振动特征的BPFO频率列表(Hz)
+        """
+        config = config or {}
+        self.step = config.get('step', 1.0)
+        self.allowed_lateness = config.get('allowed_lateness', 2.0)
+        self.idle_timeout = config.get('idle_timeout', 30.0)
+        self.buffer_capacity = config.get('buffer_capacity', 65536)
+        self.tolerance = config.get('tolerance', 5.0)
+        self.max_grid_points = config.get('max_grid_points', 3600)
+        self.bpfo_frequencies = np.asarray(config.get('bpfo_frequencies', DEFAULT_BPFO_FREQUENCIES))
+        self.bpfo_tolerance = config.get('bpfo_tolerance', 3.0)
+
+        # 健康评分参数
+        self.baseline_alpha = config.get('baseline_alpha', 0.01)   # 温度基线EWMA系数(每个格点)
+        self.temp_rise_span = config.get('temp_rise_span', 20.0)    # 温升达到该值时温度分量为1(°C)
+        self.vibration_ref = config.get('vibration_ref', 0.5)       # BPFO幅值达到该值时振动分量为1(g)
+        self.nominal_speed = config.get('nominal_speed', 0.0)       # 额定带速，为0时不做转速归一化
+        self.min_speed = config.get('min_speed', 0.1)               # 低于该带速视为停机
+        self.weights = config.get('weights', {'temperature': 0.4, 'vibration': 0.4, 'combined': 0.6})
+
+        self.idlers = {}
+        self._idlers_lock = threading.Lock()
+
+    def _get_idler(self, idler_id):
+        idler = self.idlers.get(idler_id)
+        if idler is None:
+            with self._idlers_lock:
+                idler = self.idlers.get(idler_id)
+                if idler is None:
+                    idler = IdlerState(idler_id)
+                    self.idlers[idler_id] = idler
+        return idler
+
+    def ingest(self, idler_id, stream, timestamps, values):
+        """
+        批量写入一个数据流的数据
+
+        参数:
+            idler_id: 托辊ID
+            stream: 数据流名称('temperature'、'vibration'或'speed')
+            timestamps: Unix时间戳数组(秒)
+            values: 数值数组
+
+        返回:
+            实际接收的点数(迟到数据被丢弃)
+        """
+        if stream not in STREAM_AGGREGATION:
+            raise ValueError(f"不支持的数据流: {stream}")
+
+        timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+
+        idler = self._get_idler(idler_id)
+        with idler.lock:
+            # 不晚于已输出的最后一个时间格的数据不会再影响结果，视为迟到数据
+            cutoff = idler.last_emitted if idler.last_emitted is not None else -np.inf
+            on_time = timestamps > cutoff
+            accepted = int(np.count_nonzero(on_time))
+            if accepted < len(timestamps):
+                idler.late_dropped += len(timestamps) - accepted
+                timestamps, values = timestamps[on_time], values[on_time]
+
+            buffer = idler.streams.get(stream)
+            if buffer is None:
+                buffer = idler.streams[stream] = StreamBuffer(self.buffer_capacity)
+            buffer.append(timestamps, values)
+        return accepted
+
+    def ingest_reading(self, idler_id, reading):
+        """
+        写入一条BaseSensor采集记录
+
+        温度取data['temperature']，振动取BPFO频率附近FFT峰值的最大幅值
+        (逐点记录取fft_peaks，窗口记录取各轴的top-K峰值，二进制窗口记录先解码)，
+        转速取data['speed']，其他类型的记录忽略。
+        """
+        data = reading.get('data') or {}
+        sensor_type = reading.get('sensor_type')
+
+        if sensor_type == 'TEMPERATURE':
+            stream, value = 'temperature', data.get('temperature')
+        elif sensor_type == 'VIBRATION':
+            stream, value = 'vibration', self._bpfo_amplitude(self._vibration_peaks(data))
+        elif sensor_type == 'SPEED':
+            stream, value = 'speed', data.get('speed')
+        else:
+            return 0
+
+        if value is None:
+            return 0
+
+        ts = datetime.datetime.fromisoformat(reading['timestamp']).timestamp()
+        return self.ingest(idler_id, stream, [ts], [value])
+
+    def _vibration_peaks(self, data):
+        """从振动记录中取出FFT峰值列表(兼容逐点记录和窗口记录)"""
+        if data.get('mode') != 'window':
+            return data.get('fft_peaks', [])
+
+        if data.get('encoding') == 'binary':
+            # 延迟导入，融合引擎本身不依赖振动传感器模块
+            from .vibration_sensor import decode_window
+            payload = data['payload']
+            if isinstance(payload, str):
+                # 从本地保存的JSON行读回时为base64字符串
+                payload = base64.b64decode(payload)
+            data = decode_window(payload)
+
+        return [
+            {'frequency': f, 'amplitude': a}
+            for freqs, amps in zip(data.get('peak_frequencies', []), data.get('peak_amplitudes', []))
+            for f, a in zip(freqs, amps)
+        ]
+
+    def _bpfo_amplitude(self, peaks):
+        """从FFT峰值列表中提取BPFO频率附近的最大幅值"""
+        if not peaks:
+            return 0.0
+        freqs = np.fromiter((p['frequency'] for p in peaks), dtype=np.float64, count=len(peaks))
+        amps = np.fromiter((p['amplitude'] for p in peaks), dtype=np.float64, count=len(peaks))
+        near = (np.abs(freqs[:, None] - self.bpfo_frequencies[None, :]) < self.bpfo_tolerance).any(axis=1)
+        return float(amps[near].max()) if near.any() else 0.0
+
+    def advance(self):
+        """
+        推进所有托辊的水位线并计算新的融合结果
+
+        返回:
+            {托辊ID: 融合结果字典}，只包含本次有新结果的托辊；
+            融合结果中各字段为与timestamps等长的数组
+        """
+        results = {}
+        for idler in list(self.idlers.values()):
+            with idler.lock:
+                fused = self._advance_idler(idler)
+            if fused is not None:
+                results[idler.idler_id] = fused
+        return results
+
+    def _advance_idler(self, idler):
+        active = [b for b in idler.streams.values() if b.max_ts > -np.inf]
+        if not active:
+            return None
+
+        # 长时间无数据的流不参与水位线计算，避免单个离线传感器阻塞整个托辊
+        newest = max(b.max_ts for b in active)
+        live = [b.max_ts for b in active if newest - b.max_ts <= self.idle_timeout]
+        watermark = min(live) - self.allowed_lateness
+        if watermark <= idler.watermark:
+            return None
+
+        # 生成本次需要计算的时间格
+        if idler.last_emitted is None:
+            # 第一个时间格取不早于最早样本的格点，max聚合区间为(t - step, t]，
+            # 恰好落在格点上的样本必须由该格点本身覆盖
+            first_ts = min(float(b.view()[0][0]) for b in active)
+            idler.last_emitted = (np.ceil(first_ts / self.step) - 1) * self.step
+        start = idler.last_emitted + self.step
+        if (watermark - start) / self.step > self.max_grid_points:
+            start = watermark - (self.max_grid_points - 1) * self.step
+        grid = np.arange(start, watermark + 1e-9, self.step)
+
+        idler.watermark = watermark
+        if len(grid) == 0:
+            return None
+        idler.last_emitted = float(grid[-1])
+
+        # 向量化连接各数据流
+        columns = {}
+        for name, how in STREAM_AGGREGATION.items():
+            buffer = idler.streams.get(name)
+            if buffer is None or len(buffer) == 0:
+                columns[name] = np.full(len(grid), np.nan)
+                continue
+            ts, values = buffer.view()
+            columns[name] = self._aggregate(ts, values, grid, how)
+            buffer.evict_before(grid[-1] - max(self.tolerance, self.step))
+
+        health = self._health_score(idler, columns)
+        fused = {'timestamps': grid, 'health': health, **columns}
+        idler.latest = {
+            'timestamp': float(grid[-1]),
+            'health': float(health[-1]),
+            'temperature': float(columns['temperature'][-1]),
+            'vibration': float(columns['vibration'][-1]),
+            'speed': float(columns['speed'][-1])
+        }
+        return fused
+
+    def _aggregate(self, ts, values, grid, how):
+        """在时间格上聚合一个数据流"""
+        if how == 'last':
+            idx = np.searchsorted(ts, grid, side='right') - 1
+            clipped = np.clip(idx, 0, None)
+            valid = (idx >= 0) & (grid - ts[clipped] <= self.tolerance)
+            return np.where(valid, values[clipped], np.nan)
+
+        # max: 区间(t - step, t]内的最大值，用reduceat一次完成所有区间
+        left = np.searchsorted(ts, grid - self.step, side='right')
+        right = np.searchsorted(ts, grid, side='right')
+        out = np.full(len(grid), np.nan)
+        nonempty = right > left
+        if nonempty.any():
+            starts = left[nonempty]
+            out[nonempty] = np.maximum.reduceat(values[:right[nonempty][-1]], starts)
+        return out
+
+    def _health_score(self, idler, columns):
+        """
+        计算综合健康评分(1为健康，0为严重故障)
+
+        温度分量为相对基线的温升，振动分量为(按带速归一化后的)BPFO幅值，
+        温升与BPFO峰值同时出现时额外叠加联合分量，这是轴承外圈故障的典型组合特征。
+        """
+        temperature = columns['temperature']
+        vibration = columns['vibration']
+        speed = columns['speed']
+
+        # 温度基线: 按本批数据的均值做等效EWMA更新，温升相对更新前的基线计算
+        valid_temp = temperature[~np.isnan(temperature)]
+        if idler.temp_baseline is None and len(valid_temp):
+            idler.temp_baseline = float(valid_temp[0])
+        baseline = idler.temp_baseline if idler.temp_baseline is not None else np.nan
+        temp_score = np.clip((temperature - baseline) / self.temp_rise_span, 0.0, 1.0)
+        if len(valid_temp):
+            alpha = 1.0 - (1.0 - self.baseline_alpha) ** len(valid_temp)
+            idler.temp_baseline += alpha * (float(valid_temp.mean()) - idler.temp_baseline)
+
+        # 振动分量: 有转速数据时按额定带速归一化，停机时不计
+        vib = vibration
+        if self.nominal_speed > 0:
+            ratio = np.where(np.isnan(speed), 1.0, speed / self.nominal_speed)
+            vib = vibration / np.maximum(ratio, self.min_speed / self.nominal_speed)
+        vib_score = np.clip(vib / self.vibration_ref, 0.0, 1.0)
+        vib_score = np.where(speed < self.min_speed, 0.0, vib_score)
+
+        temp_score = np.nan_to_num(temp_score)
+        vib_score = np.nan_to_num(vib_score)
+        w = self.weights
+        risk = w['temperature'] * temp_score + w['vibration'] * vib_score + \
+            w['combined'] * temp_score * vib_score
+        return 1.0 - np.clip(risk, 0.0, 1.0)
+
+    def get_health(self, idler_id=None):
+        """获取最新健康评分(指定托辊或全部托辊)"""
+        if idler_id is not None:
+            idler = self.idlers.get(idler_id)
+            return idler.latest if idler else None
+        return {i: s.latest for i, s in self.idlers.items() if s.latest is not None}
+
+    def get_stats(self):
+        """获取各托辊的缓冲区占用和数据丢弃统计"""
+        return {
+            idler_id: {
+                'watermark': idler.watermark,
+                'late_dropped': idler.late_dropped,
+                'buffered': {name: len(b) for name, b in idler.streams.items()},
+                'overflow_dropped': {name: b.overflow_dropped for name, b in idler.streams.items()}
+            }
+            for idler_id, idler in self.idlers.items()
+        }
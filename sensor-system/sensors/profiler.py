@@ -0,0 +1,299 @@
+# 运行时性能剖析工具 - 无需重启即可对运行中的进程进行限时剖析
+#
+# 注意: backend/app/services/profiler.py 中有 _output_path、sample_stacks、capture_memory、
+# RuntimeProfiler 的副本(两端分别部署，不共享代码包)，修改这些函数时须同步修改。
+import os
+import re
+import sys
+import time
+import datetime
+import threading
+import logging
+import cProfile
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger("Profiler")
+
+# 剖析结果默认输出目录
+PROFILE_DIR = 'profiles'
+
+# 单次剖析允许的最长时间(秒)，防止误操作导致长期开销
+MAX_PROFILE_DURATION = 300.0
+
+# 进程内同一时间只允许一个cProfile会话(Python 3.12起同时启用多个会报错)
+_CPROFILE_LOCK = threading.Lock()
+
+
+def _output_path(output_dir, prefix, ext):
+    """生成带时间戳和进程号的输出文件路径"""
+    os.makedirs(output_dir, exist_ok=True)
+    # 设备ID可能包含路径分隔符(如/dev/ttyUSB0)，替换为下划线
+    prefix = re.sub(r'[^\w.-]', '_', prefix)
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f"{prefix}_{stamp}_{os.getpid()}.{ext}")
+
+
+def _clamp_duration(duration):
+    """限制剖析时长在(0, MAX_PROFILE_DURATION]区间内"""
+    duration = float(duration)
+    if duration <= 0:
+        raise ValueError("剖析时长必须大于0")
+    return min(duration, MAX_PROFILE_DURATION)
+
+
+def sample_stacks(duration, interval=0.005, output_dir=PROFILE_DIR):
+    """
+    采样式调用栈捕获
+
+    定时抓取所有线程(采样线程自身除外)的调用栈，按折叠格式汇总后写入文件，
+    结果可直接用 flamegraph.pl 或 speedscope 查看。
+
+    参数:
+        duration: 采样时长(秒)
+        interval: 采样间隔(秒)
+        output_dir: 输出目录
+
+    返回:
+        输出文件路径
+    """
+    duration = _clamp_duration(duration)
+    own_id = threading.get_ident()
+    names = {}
+    counts = Counter()
+    samples = 0
+
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        names.update((t.ident, t.name) for t in threading.enumerate())
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            counts[';'.join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    path = _output_path(output_dir, 'stacks', 'folded')
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+    logger.info(f"调用栈采样完成: {samples} 次采样, 结果写入 {path}")
+    return path
+
+
+def capture_memory(duration, top=50, output_dir=PROFILE_DIR):
+    """
+    tracemalloc 内存快照
+
+    在剖析窗口起止各取一次快照，输出窗口内的内存增长排行和结束时的完整快照。
+
+    参数:
+        duration: 观察时长(秒)
+        top: 报告中列出的条目数
+        output_dir: 输出目录
+
+    返回:
+        文本报告路径
+    """
+    duration = _clamp_duration(duration)
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(25)
+
+    try:
+        baseline = tracemalloc.take_snapshot()
+        time.sleep(duration)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    snapshot_path = _output_path(output_dir, 'memory', 'tracemalloc')
+    snapshot.dump(snapshot_path)
+
+    report_path = _output_path(output_dir, 'memory', 'txt')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"# 内存增长排行(观察 {duration:.1f} 秒)\n")
+        for stat in snapshot.compare_to(baseline, 'lineno')[:top]:
+            f.write(f"{stat}\n")
+        f.write("\n# 当前内存占用排行\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            f.write(f"{stat}\n")
+
+    logger.info(f"内存快照完成, 报告写入 {report_path}")
+    return report_path
+
+
+def dump_cprofile(profile, prefix, output_dir=PROFILE_DIR, top=50):
+    """将cProfile结果写出为.prof文件和按累计耗时排序的文本报告"""
+    import io
+    import pstats
+    
+    prof_path = _output_path(output_dir, prefix, 'prof')
+    profile.dump_stats(prof_path)
+
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(top)
+    with open(prof_path[:-len('prof')] + 'txt', 'w', encoding='utf-8') as f:
+        f.write(stream.getvalue())
+
+    logger.info(f"cProfile结果写入 {prof_path}")
+    return prof_path
+
+
+def cprofile_busy():
+    """进程内是否已有cProfile会话在进行"""
+    return _CPROFILE_LOCK.locked()
+
+
+class ScopedProfiler:
+    """
+    作用于单个线程的cProfile
+
+    cProfile只记录启用它的线程，因此由其他线程调用arm()登记请求，
+    由目标线程在循环中调用poll()实际启停，到期后自动写出结果。
+    整个进程同一时间只允许一个会话: arm()成功时即占用进程内的会话，直到剖析结束、
+    出错或采集循环退出时才释放，因此请求尚未启动时其他传感器的arm()同样会被拒绝；
+    poll()和finish()出错时只记录日志并撤销请求，不会向采集循环抛出异常。
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._request = None
+        self._profile = None
+        self._deadline = 0.0
+        self._output_dir = PROFILE_DIR
+        self.last_result = None
+
+    @property
+    def active(self):
+        return self._profile is not None
+
+    def arm(self, duration, output_dir=PROFILE_DIR):
+        """
+        登记一次剖析请求(可在任意线程调用)
+
+        返回:
+            是否登记成功(已有cProfile会话进行中或等待启动时拒绝)
+        """
+        # 登记时即占用会话，由poll()启动后的finish()或_disarm()释放
+        if not _CPROFILE_LOCK.acquire(blocking=False):
+            logger.warning(f"已有cProfile会话进行中，拒绝 {self.prefix} 的剖析请求")
+            return False
+        self._request = (_clamp_duration(duration), output_dir)
+        return True
+
+    def poll(self):
+        """在目标线程中调用，按需启动或结束剖析"""
+        try:
+            if self._profile is None:
+                self._start()
+            elif time.monotonic() >= self._deadline:
+                self.finish()
+        except Exception as e:
+            logger.error(f"{self.prefix} cProfile剖析出错，已取消: {str(e)}")
+            self._disarm()
+
+    def _start(self):
+        """处理登记的请求(会话已在arm()中占用)"""
+        request = self._request
+        if request is None:
+            return
+
+        duration, self._output_dir = request
+        self._deadline = time.monotonic() + duration
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._request = None
+        logger.info(f"{self.prefix} cProfile已启动, 持续 {duration:.1f} 秒")
+
+    def _disarm(self):
+        """撤销请求并释放占用的会话(不写出结果)"""
+        request, self._request = self._request, None
+        profile, self._profile = self._profile, None
+        if profile is not None:
+            try:
+                profile.disable()
+            except Exception:
+                pass
+        if request is not None or profile is not None:
+            _CPROFILE_LOCK.release()
+
+    def finish(self):
+        """立即结束当前剖析并写出结果(须在目标线程中调用)，尚未启动的请求直接撤销"""
+        if self._profile is None:
+            self._disarm()
+            return None
+        try:
+            self._profile.disable()
+            self.last_result = dump_cprofile(self._profile, self.prefix, self._output_dir)
+        except Exception as e:
+            logger.error(f"写出cProfile结果失败: {str(e)}")
+        finally:
+            self._profile = None
+            _CPROFILE_LOCK.release()
+        return self.last_result
+
+
+class RuntimeProfiler:
+    """运行时剖析调度器，在后台线程中执行限时的调用栈采样和内存快照"""
+
+    MODES = ('stack', 'memory')
+
+    def __init__(self, output_dir=PROFILE_DIR):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.results = {}
+
+    def start(self, mode, duration):
+        """
+        启动一次后台剖析
+
+        参数:
+            mode: 'stack'(调用栈采样) 或 'memory'(tracemalloc快照)
+            duration: 剖析时长(秒)
+
+        返回:
+            是否成功启动(同一模式同时只允许一个任务)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的剖析模式: {mode}")
+        duration = _clamp_duration(duration)
+
+        with self._lock:
+            job = self._jobs.get(mode)
+            if job is not None and job.is_alive():
+                logger.warning(f"{mode} 剖析已在进行中")
+                return False
+            job = threading.Thread(target=self._run, args=(mode, duration),
+                                   name=f"profiler-{mode}", daemon=True)
+            self._jobs[mode] = job
+            job.start()
+        return True
+
+    def _run(self, mode, duration):
+        try:
+            if mode == 'stack':
+                path = sample_stacks(duration, output_dir=self.output_dir)
+            else:
+                path = capture_memory(duration, output_dir=self.output_dir)
+            self.results[mode] = path
+        except Exception as e:
+            logger.error(f"{mode} 剖析失败: {str(e)}")
+
+    def status(self):
+        """返回各模式的运行状态和最近一次结果文件"""
+        with self._lock:
+            running = [mode for mode, job in self._jobs.items() if job.is_alive()]
+        return {
+            'running': running,
+            'results': dict(self.results)
+        }
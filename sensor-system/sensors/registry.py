@@ -0,0 +1,57 @@
+# 传感器注册表 - 按类型名称延迟导入传感器类，未使用的传感器类型不会加载其依赖
+import importlib
+import threading
+
+# 类型名称 -> "模块:类名"，模块只在首次使用该类型时导入
+SENSOR_REGISTRY = {
+    'temperature': 'sensors.temperature_sensor:TemperatureSensor',
+    'camera': 'sensors.camera_sensor:CameraSensor',
+    'vibration': 'sensors.vibration_sensor:VibrationSensor',
+    'acoustic': 'sensors.acoustic_sensor:AcousticSensor',
+    'current': 'sensors.current_sensor:CurrentSensor',
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+def register_sensor(type_name, target):
+    """
+    注册传感器类型
+    
+    参数:
+        type_name: 类型名称(配置文件中的type字段)
+        target: "模块:类名"字符串或传感器类
+    """
+    with _lock:
+        if isinstance(target, str):
+            SENSOR_REGISTRY[type_name] = target
+            _loaded.pop(type_name, None)
+        else:
+            SENSOR_REGISTRY[type_name] = f"{target.__module__}:{target.__name__}"
+            _loaded[type_name] = target
+
+def get_sensor_class(type_name):
+    """获取传感器类(首次调用时导入对应模块)"""
+    cls = _loaded.get(type_name)
+    if cls is not None:
+        return cls
+    
+    if type_name not in SENSOR_REGISTRY:
+        raise ValueError(f"未知的传感器类型: {type_name}")
+    
+    with _lock:
+        cls = _loaded.get(type_name)
+        if cls is None:
+            module_name, class_name = SENSOR_REGISTRY[type_name].split(':')
+            cls = getattr(importlib.import_module(module_name), class_name)
+            _loaded[type_name] = cls
+    return cls
+
+def create_sensor(spec):
+    """
+    根据配置创建传感器实例
+    
+    参数:
+        spec: 传感器配置字典，type字段指定类型，其余字段作为传感器配置
+    """
+    return get_sensor_class(spec['type'])(spec)
@@ -0,0 +1,176 @@
+# 边缘侧自适应上报 - 只在数值变化超出容差、状态等级变化或心跳到期时上报
+import logging
+
+logger = logging.getLogger("AdaptiveReporter")
+
+
+class AdaptiveReporter:
+    """
+    自适应上报器
+
+    支持两种压缩方式:
+        deadband:      死区压缩，数值偏离上次上报值超过容差时上报，
+                       按"保持上次上报值"重建，误差不超过容差
+        swinging_door: 旋转门压缩(SDT)，按上报点之间线性插值重建，
+                       误差不超过容差，对缓慢漂移的信号压缩率远高于死区；
+                       段结束点取门中线上的值，与实测值的偏差也在容差内
+
+    此外状态等级变化和心跳到期时强制上报。所有上报点都带有原始时间戳。
+    """
+
+    DEADBAND = 'deadband'
+    SWINGING_DOOR = 'swinging_door'
+
+    def __init__(self, mode=SWINGING_DOOR, tolerance=1.0, heartbeat=60.0,
+                 classify=None, max_segment=10000):
+        """
+        初始化上报器
+
+        参数:
+            mode: 压缩方式('deadband' 或 'swinging_door')
+            tolerance: 容差(重建误差上限)
+            heartbeat: 心跳间隔(秒)，超过该时间未上报时强制上报，None表示不启用
+            classify: 状态等级函数 value -> 等级，等级变化时强制上报(可选)
+            max_segment: 单个压缩段最多缓存的点数，超过时强制上报
+        """
+        if mode not in (self.DEADBAND, self.SWINGING_DOOR):
+            raise ValueError(f"不支持的压缩方式: {mode}")
+        self.mode = mode
+        self.tolerance = tolerance
+        self.heartbeat = heartbeat
+        self.classify = classify
+        self.max_segment = max_segment
+
+        # 最近一次上报的点(旋转门的门轴)
+        self._sent = None
+        self._sent_class = None
+        # 旋转门: 当前段内的点、上一个点、门的上下斜率
+        self._segment = []
+        self._prev = None
+        self._upper = float('inf')
+        self._lower = float('-inf')
+
+        # 统计信息
+        self.received = 0
+        self.sent = 0
+        self.max_error = 0.0
+
+    def offer(self, t, value):
+        """
+        输入一个采样点
+
+        参数:
+            t: 时间戳(秒)
+            value: 数值
+
+        返回:
+            需要上报的点列表 [(时间戳, 数值, 原因), ...]，可能为空
+        """
+        self.received += 1
+        out = []
+
+        if self._sent is None:
+            return self._emit(out, t, value, 'initial')
+
+        reason = self._forced_reason(t, value)
+
+        if self.mode == self.DEADBAND:
+            error = abs(value - self._sent[1])
+            if error > self.tolerance:
+                return self._emit(out, t, value, 'deadband')
+            if reason:
+                return self._emit(out, t, value, reason)
+            self.max_error = max(self.max_error, error)
+            return out
+
+        # 旋转门: 以上次上报点为门轴，用当前点收紧上下门斜率。门关闭(下斜率超过上斜率)时，
+        # 在前一个点的时刻按关闭前的门中线取值上报，该点成为新门轴；
+        # 门中线与段内每个点的偏差都不超过容差，因此重建误差有界
+        door = (self._upper, self._lower)
+        self._tighten(t, value)
+
+        if self._lower > self._upper and self._prev is not None:
+            self._emit_on_door(out, door, 'swinging_door')
+            door = (self._upper, self._lower)
+            self._tighten(t, value)
+
+        if reason is None and len(self._segment) >= self.max_segment:
+            reason = 'segment_limit'
+
+        if reason == 'status_change' or (reason and self._prev is None):
+            # 状态等级变化时先结束当前段，再上报当前点的实际值
+            if self._prev is not None:
+                self._emit_on_door(out, door, reason)
+            return self._emit(out, t, value, reason)
+
+        if reason:
+            # 心跳或段长度超限只需结束当前段，当前点进入新的段
+            self._emit_on_door(out, door, reason)
+            self._tighten(t, value)
+
+        self._segment.append((t, value))
+        self._prev = (t, value)
+        return out
+
+    def _tighten(self, t, value):
+        """用一个点收紧旋转门的上下斜率"""
+        t0, v0 = self._sent
+        dt = t - t0
+        if dt > 0:
+            self._upper = min(self._upper, (value + self.tolerance - v0) / dt)
+            self._lower = max(self._lower, (value - self.tolerance - v0) / dt)
+
+    def _emit_on_door(self, out, door, reason):
+        """在前一个点的时刻按门中线取值上报"""
+        t0, v0 = self._sent
+        t_prev, v_prev = self._prev
+        upper, lower = door
+        if upper == float('inf'):
+            value = v_prev
+        else:
+            value = v0 + (upper + lower) / 2 * (t_prev - t0)
+        self._emit(out, t_prev, value, reason)
+
+    def _forced_reason(self, t, value):
+        """判断是否需要强制上报(状态等级变化或心跳到期)"""
+        if self.classify is not None and self.classify(value) != self._sent_class:
+            return 'status_change'
+        if self.heartbeat is not None and t - self._sent[0] >= self.heartbeat:
+            return 'heartbeat'
+        return None
+
+    def _emit(self, out, t, value, reason):
+        """记录上报点，结束当前压缩段并统计其重建误差"""
+        if self.mode == self.SWINGING_DOOR and self._sent is not None:
+            self._close_segment(t, value)
+
+        self._sent = (t, value)
+        self._sent_class = self.classify(value) if self.classify is not None else None
+        self._prev = None
+        self._upper = float('inf')
+        self._lower = float('-inf')
+        self.sent += 1
+        out.append((t, value, reason))
+        return out
+
+    def _close_segment(self, t1, v1):
+        """按两端上报点线性插值，计算段内(不晚于t1的)各点的实际重建误差"""
+        t0, v0 = self._sent
+        span = t1 - t0
+        for t, value in self._segment:
+            if t > t1:
+                break
+            estimate = v0 + (v1 - v0) * (t - t0) / span if span > 0 else v0
+            self.max_error = max(self.max_error, abs(value - estimate))
+        self._segment = [p for p in self._segment if p[0] > t1]
+
+    def get_stats(self):
+        """获取上报统计信息"""
+        return {
+            'mode': self.mode,
+            'tolerance': self.tolerance,
+            'received': self.received,
+            'sent': self.sent,
+            'compression_ratio': self.received / self.sent if self.sent else 0.0,
+            'max_error': self.max_error
+        }
@@ -3,8 +3,8 @@ import time
 import datetime
 import random
 import logging
-import requests
 from sensors.base_sensor import BaseSensor, SensorType, SensorStatus
+from sensors.reporting import AdaptiveReporter
 
 logger = logging.getLogger("TemperatureSensor")
 
@@ -21,6 +21,28 @@ class TemperatureSensor(BaseSensor):
         
         # 单位
         self.unit = config.get('params', {}).get('unit', 'celsius')
+        
+        # 上报的轴承ID(可选)，以及与后端一致的状态阈值(正常上限, 警告上限)
+        self.bearing_id = config.get('bearing_id')
+        self.thresholds = config.get('thresholds', (60.0, 80.0))
+        
+        # 自适应上报: 只在温度变化超出容差、状态等级变化或心跳到期时发送
+        reporting = config.get('reporting', {})
+        self.reporter = AdaptiveReporter(
+            mode=reporting.get('mode', AdaptiveReporter.SWINGING_DOOR),
+            tolerance=reporting.get('tolerance', 1.0),
+            heartbeat=reporting.get('heartbeat', 60.0),
+            classify=self._classify
+        ) if reporting.get('enabled', True) else None
+    
+    def _classify(self, temperature):
+        """按后端阈值确定温度状态等级"""
+        normal_threshold, warning_threshold = self.thresholds
+        if temperature >= warning_threshold:
+            return 'danger'
+        if temperature >= normal_threshold:
+            return 'warning'
+        return 'normal'
     
     def _connect(self):
         """连接到温度传感器"""
@@ -73,21 +95,57 @@ class TemperatureSensor(BaseSensor):
         temperature = normal_temp + periodic_component + noise + anomaly_temp
         
         # 发送到主系统
-        self._send_to_main_system(temperature)
+        reported = self._report(temperature)
         
-        return {
+        data = {
             'temperature': temperature,
             'unit': self.unit,
+            'status': self._classify(temperature),
             'simulated': True,
-            'anomaly': anomaly
+            'anomaly': anomaly,
+            'reported': reported
         }
+        if self.reporter is not None:
+            # 上报压缩率和重建误差(不超过tolerance)随读数一起输出，便于运维核对
+            data['reporting'] = self.reporter.get_stats()
+        return data
     
-    def _send_to_main_system(self, temperature):
+    def _report(self, temperature):
+        """
+        经自适应上报器过滤后发送温度数据
+        
+        返回:
+            本次发送的点数
+        """
+        now = time.time()
+        if self.reporter is None:
+            self._send_to_main_system(temperature, now)
+            return 1
+        
+        points = self.reporter.offer(now, temperature)
+        for t, value, reason in points:
+            self._send_to_main_system(value, t)
+        
+        if points and points[-1][2] == 'heartbeat':
+            stats = self.reporter.get_stats()
+            logger.debug(f"温度上报压缩率: {stats['compression_ratio']:.1f}, 最大重建误差: {stats['max_error']:.2f}°C")
+        return len(points)
+    
+    def _send_to_main_system(self, temperature, timestamp=None):
         """将温度数据发送到主系统"""
         try:
+            # 延迟导入requests，加快网关启动
+            import requests
+            
+            payload = {'temperature': temperature}
+            if timestamp is not None:
+                payload['timestamp'] = datetime.datetime.fromtimestamp(timestamp).isoformat()
+            if self.bearing_id is not None:
+                payload['bearing_id'] = self.bearing_id
+            
             response = requests.post(
                 'http://localhost:5000/api/bearing-temperature',
-                json={'temperature': temperature},
+                json=payload,
                 timeout=2
             )
             if response.status_code != 200:
@@ -6,12 +6,111 @@ import numpy as np
 import logging
 import json
 import os
-import serial
-import requests
+import struct
 from .base_sensor import BaseSensor, SensorType, SensorStatus
 
 logger = logging.getLogger("VibrationSensor")
 
+# 窗口特征记录的二进制编码: 固定头部 + 故障类型名称表 + float32数组
+# 头部: 标识 "VW", 版本, 轴数, 频带数, 每轴峰值数, 故障类型数, 检测到的故障序号(255表示无),
+#       窗口起始时间, 窗口采样点数, 采样率
+# 名称表: 每个故障类型一个字节的长度加UTF-8名称；频带边界作为第一个float32数组
+WINDOW_MAGIC = b'VW'
+WINDOW_VERSION = 2
+_WINDOW_HEADER = struct.Struct('<2sBBBBBBdII')
+_NO_FAULT = 255
+_AXES = ['X', 'Y', 'Z']
+
+
+def encode_window(record):
+    """
+    将窗口特征记录编码为二进制
+
+    头部之后是故障类型名称表，数组按 bands(频带上下限)、rms、peak、crest_factor、kurtosis、
+    band_energy、peak_frequencies、peak_amplitudes、fault_scores 的顺序以小端float32连续存放
+    """
+    axes = len(record['rms'])
+    n_bands = len(record['bands'])
+    top_k = len(record['peak_frequencies'][0]) if axes else 0
+    detection = record['fault_detection']
+    fault_index = record['fault_types'].index(detection['fault_type']) if detection['detected'] else _NO_FAULT
+
+    header = _WINDOW_HEADER.pack(
+        WINDOW_MAGIC, WINDOW_VERSION, axes, n_bands, top_k, len(record['fault_scores']), fault_index,
+        record['window_start'], record['window_size'], int(record['sampling_rate'])
+    )
+    names = b''.join(bytes([len(name)]) + name for name in
+                     (str(fault_type).encode('utf-8') for fault_type in record['fault_types']))
+    arrays = [record['bands']] + [record[key] for key in (
+        'rms', 'peak', 'crest_factor', 'kurtosis', 'band_energy',
+        'peak_frequencies', 'peak_amplitudes', 'fault_scores')]
+    body = np.concatenate([np.ravel(np.asarray(a, dtype='<f4')) for a in arrays])
+    return header + names + body.tobytes()
+
+
+def decode_window(payload):
+    """
+    解码二进制窗口特征记录
+
+    参数:
+        payload: encode_window生成的字节串
+
+    返回:
+        与窗口模式字典输出结构相同的记录
+    """
+    magic, version, axes, n_bands, top_k, n_faults, fault_index, start, size, rate = \
+        _WINDOW_HEADER.unpack_from(payload)
+    if magic != WINDOW_MAGIC or version != WINDOW_VERSION:
+        raise ValueError(f"不支持的窗口记录格式: {magic!r} v{version}")
+
+    offset = _WINDOW_HEADER.size
+    fault_types = []
+    for _ in range(n_faults):
+        length = payload[offset]
+        fault_types.append(payload[offset + 1:offset + 1 + length].decode('utf-8'))
+        offset += 1 + length
+
+    shapes = [('bands', (n_bands, 2)), ('rms', (axes,)), ('peak', (axes,)), ('crest_factor', (axes,)),
+              ('kurtosis', (axes,)), ('band_energy', (axes, n_bands)), ('peak_frequencies', (axes, top_k)),
+              ('peak_amplitudes', (axes, top_k)), ('fault_scores', (n_faults,))]
+    values = np.frombuffer(payload, dtype='<f4', offset=offset).astype(np.float64)
+    arrays = {}
+    offset = 0
+    for key, shape in shapes:
+        count = int(np.prod(shape))
+        arrays[key] = values[offset:offset + count].reshape(shape).tolist()
+        offset += count
+
+    rms = arrays['rms']
+    record = {
+        'mode': 'window',
+        'window_start': start,
+        'window_size': size,
+        'sampling_rate': rate,
+        'unit': 'g',
+        'axes': _AXES[:axes],
+        'rms': rms,
+        'peak': arrays['peak'],
+        'crest_factor': arrays['crest_factor'],
+        'kurtosis': arrays['kurtosis'],
+        'composite_rms': float(np.sqrt(np.sum(np.square(rms)))),
+        'bands': [tuple(band) for band in arrays['bands']],
+        'band_energy': arrays['band_energy'],
+        'peak_frequencies': arrays['peak_frequencies'],
+        'peak_amplitudes': arrays['peak_amplitudes'],
+        'fault_types': fault_types,
+        'fault_scores': arrays['fault_scores']
+    }
+    if fault_index == _NO_FAULT:
+        record['fault_detection'] = {'detected': False}
+    else:
+        record['fault_detection'] = {
+            'detected': True,
+            'fault_type': fault_types[fault_index],
+            'confidence': min(record['fault_scores'][fault_index], 1.0)
+        }
+    return record
+
 class VibrationSensor(BaseSensor):
     """振动传感器，用于检测托辊振动情况"""
     
@@ -34,7 +133,7 @@ class VibrationSensor(BaseSensor):
         self.max_fft_history = 10
         
         # 故障特征频率(Hz) - 不同故障类型的特征频率
-        self.fault_frequencies = {
+        self.fault_frequencies = config.get('fault_frequencies') or {
             'bearing_outer': [85.4, 103.6, 128.9],  # 轴承外圈故障
             'bearing_inner': [142.8, 165.2, 189.7], # 轴承内圈故障
             'roller_defect': [46.3, 68.7, 93.5],    # 滚动体故障
@@ -42,6 +141,44 @@ class VibrationSensor(BaseSensor):
             'unbalance': [23.3, 35.7, 47.1],        # 不平衡
             'misalignment': [117.6, 134.2, 151.8]   # 不对中
         }
+        self.fault_tolerance = config.get('fault_tolerance', 3.0)  # 允许3Hz误差
+        self.fault_threshold = config.get('fault_threshold', 0.2)  # 故障得分阈值
+        
+        # 输出模式: sample为逐样本输出，window为每个分析窗口输出一条紧凑的特征记录
+        self.output_mode = config.get('output_mode', 'sample')
+        self.window_size = config.get('window_size', self.sampling_rate)  # 每个窗口的采样点数(默认1秒)
+        self.top_k = config.get('top_k', 8)                               # 每轴保留的频谱峰值个数
+        self.bands = config.get('bands', [(1, 20), (20, 50), (50, 100), (100, 200), (200, 500)])
+        self.encoding = config.get('encoding', 'dict')                    # 窗口记录编码: dict 或 binary
+        self.axes = _AXES[:min(self.axis, 3)]
+        
+        if self.output_mode == 'window':
+            self._prepare_window()
+            # 模拟模式每次生成一整个窗口，按窗口时长控制节奏
+            if self.simulate:
+                self.sampling_interval = self.window_size / self.sampling_rate
+    
+    def _prepare_window(self):
+        """预分配窗口缓冲区、窗函数和频带索引"""
+        n = self.window_size
+        self._buffer = np.zeros((len(self.axes), n))
+        self._filled = 0
+        self._window_start = None
+        self.window = np.hanning(n)
+        self._window_gain = self.window.sum() / 2.0
+        self.freqs = np.fft.rfftfreq(n, 1.0 / self.sampling_rate)
+        
+        # 频带边界对应的频点索引，累积和相减一次求出所有频带能量
+        nyquist = self.sampling_rate / 2
+        self.bands = [(lo, min(hi, nyquist)) for lo, hi in self.bands if lo < nyquist]
+        edges = np.searchsorted(self.freqs, [b for band in self.bands for b in band])
+        self._band_starts = edges[0::2]
+        self._band_ends = np.maximum(edges[1::2], self._band_starts + 1)
+        self._cumulative = np.zeros((len(self.axes), len(self.freqs) + 1))
+        
+        # 模拟信号的时间基准
+        self._t = np.arange(n) / self.sampling_rate
+        self._sim_offset = 0
     
     def _connect(self):
         """连接到振动传感器"""
@@ -50,7 +187,8 @@ class VibrationSensor(BaseSensor):
                 logger.info("使用模拟振动传感器数据")
                 return True
                 
-            # 连接到实际振动传感器(通过串口)
+            # 连接到实际振动传感器(通过串口，仅在使用实际设备时导入pyserial)
+            import serial
             self.serial_port = serial.Serial(
                 port=self.device_id,
                 baudrate=self.baud_rate,
@@ -120,6 +258,10 @@ class VibrationSensor(BaseSensor):
                 axis, value = part.split(':')
                 values[axis.strip()] = float(value.strip())
         
+        # 窗口模式: 缓存采样，窗口填满时输出一条特征记录
+        if self.output_mode == 'window':
+            return self._push_sample(values)
+        
         # 计算合成振动值
         composite = 0
         for axis_value in values.values():
@@ -143,6 +285,9 @@ class VibrationSensor(BaseSensor):
     
     def _simulate_reading(self):
         """模拟振动传感器数据"""
+        if self.output_mode == 'window':
+            return self._simulate_window()
+        
         # 生成随机振动数据
         values = {}
         
@@ -214,6 +359,128 @@ class VibrationSensor(BaseSensor):
             'fault_detection': fault_detection
         }
     
+    def _simulate_window(self):
+        """一次生成一个窗口的模拟振动数据(信号模型与逐样本模拟相同)"""
+        t = self._t + self._sim_offset / self.sampling_rate
+        self._sim_offset += self.window_size
+        start = time.time()
+        
+        # 约每50个窗口出现一次持续整个窗口的异常
+        anomaly = random.random() < 0.02
+        fault_type = None
+        if anomaly:
+            fault_type = random.choice(list(self.fault_frequencies.keys()))
+            anomaly_factor = random.uniform(3.0, 10.0)
+            logger.info(f"模拟振动异常，类型: {fault_type}, 放大系数: {anomaly_factor:.2f}")
+        
+        rotation_freq = 30.0
+        block = np.empty((len(self.axes), self.window_size))
+        for i, axis in enumerate(self.axes):
+            axis_factor = 1.0 if axis == 'Y' else (0.8 if axis == 'X' else 1.2)
+            signal = 0.1 + 0.05 * np.sin(t * rotation_freq * axis_factor)
+            signal += np.random.uniform(-0.03, 0.03, self.window_size)
+            if anomaly:
+                fault = sum(0.08 * np.sin(2 * np.pi * freq * t) for freq in self.fault_frequencies[fault_type])
+                signal += fault * anomaly_factor
+            block[i] = signal * axis_factor
+        
+        record = self._window_features(block, start)
+        if anomaly:
+            self._send_vibration_alert(record['composite_rms'], fault_type, record['fault_detection'])
+        
+        if self.encoding == 'binary':
+            return self._encode_window(record)
+        record['simulated'] = True
+        record['anomaly'] = anomaly
+        record['fault_type'] = fault_type or 'none'
+        return record
+    
+    def _push_sample(self, values):
+        """
+        写入一个采样点
+        
+        返回:
+            窗口填满时返回窗口特征记录，否则返回None
+        """
+        if self._filled == 0:
+            self._window_start = time.time()
+        for i, axis in enumerate(self.axes):
+            self._buffer[i, self._filled] = values.get(axis, 0.0)
+        self._filled += 1
+        
+        if self._filled < self.window_size:
+            return None
+        self._filled = 0
+        return self._encode_window(self._window_features(self._buffer, self._window_start))
+    
+    def _window_features(self, block, start):
+        """
+        计算一个窗口的紧凑特征
+        
+        参数:
+            block: (轴数, 采样点)形状的数组
+            start: 窗口起始时间(Unix时间戳)
+        
+        返回:
+            特征记录，各数组长度固定(轴数、频带数、top_k和故障类型数只由配置决定)
+        """
+        centered = block - block.mean(axis=1, keepdims=True)
+        
+        # 时域统计(去除直流分量)
+        m2 = np.mean(np.square(centered), axis=1)
+        rms = np.sqrt(m2)
+        peak = np.max(np.abs(centered), axis=1)
+        kurtosis = np.mean(np.square(np.square(centered)), axis=1) / np.maximum(np.square(m2), 1e-30)
+        
+        # 幅值谱和频带能量
+        amplitude = np.abs(np.fft.rfft(centered * self.window, axis=1)) / self._window_gain
+        np.cumsum(np.square(amplitude), axis=1, out=self._cumulative[:, 1:])
+        band_energy = self._cumulative[:, self._band_ends] - self._cumulative[:, self._band_starts]
+        
+        # 每轴幅值最大的top_k个局部极大值，不足时以0补齐
+        candidates = np.zeros_like(amplitude)
+        local_max = (amplitude[:, 1:-1] > amplitude[:, :-2]) & (amplitude[:, 1:-1] >= amplitude[:, 2:])
+        candidates[:, 1:-1] = np.where(local_max, amplitude[:, 1:-1], 0.0)
+        k = min(self.top_k, candidates.shape[1])
+        top = np.argpartition(candidates, -k, axis=1)[:, -k:]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(candidates, top, axis=1), axis=1), axis=1)
+        peak_amplitudes = np.zeros((len(self.axes), self.top_k))
+        peak_frequencies = np.zeros((len(self.axes), self.top_k))
+        peak_amplitudes[:, :k] = np.take_along_axis(candidates, top, axis=1)
+        peak_frequencies[:, :k] = np.where(peak_amplitudes[:, :k] > 0, self.freqs[top], 0.0)
+        
+        # 所有轴的峰值一起参与故障评分，与逐样本模式使用相同的评分规则
+        fault_types, scores = self.score_faults(peak_frequencies.reshape(1, -1), peak_amplitudes.reshape(1, -1))
+        scores = scores[0]
+        
+        record = {
+            'mode': 'window',
+            'window_start': start,
+            'window_size': self.window_size,
+            'sampling_rate': self.sampling_rate,
+            'unit': 'g',
+            'axes': self.axes,
+            'rms': rms.tolist(),
+            'peak': peak.tolist(),
+            'crest_factor': (peak / np.maximum(rms, 1e-12)).tolist(),
+            'kurtosis': kurtosis.tolist(),
+            'composite_rms': float(np.sqrt(m2.sum())),
+            'bands': self.bands,
+            'band_energy': band_energy.tolist(),
+            'peak_frequencies': peak_frequencies.tolist(),
+            'peak_amplitudes': peak_amplitudes.tolist(),
+            'fault_types': fault_types,
+            'fault_scores': scores.tolist(),
+            'fault_detection': self._fault_decision(fault_types, scores)
+        }
+        return record
+    
+    def _encode_window(self, record):
+        """按配置的编码输出窗口记录(binary时为 {'mode', 'encoding', 'payload'})"""
+        if self.encoding == 'binary':
+            return {'mode': 'window', 'encoding': 'binary', 'payload': encode_window(record)}
+        return record
+    
     def _perform_fft(self, values):
         """执行FFT分析"""
         # 在实际实现中，我们需要收集一段时间的数据，然后进行FFT
@@ -295,38 +562,56 @@ class VibrationSensor(BaseSensor):
     
     def _detect_faults(self, fft_result):
         """根据FFT结果检测可能的故障"""
-        fault_scores = {fault_type: 0 for fault_type in self.fault_frequencies}
-        
-        for peak in fft_result['peaks']:
-            freq = peak['frequency']
-            amp = peak['amplitude']
-            
-            # 检查每个频率是否接近故障特征频率
-            for fault_type, freqs in self.fault_frequencies.items():
-                for fault_freq in freqs:
-                    # 如果频率接近故障特征频率
-                    if abs(freq - fault_freq) < 3.0:  # 允许3Hz误差
-                        # 计算分数(幅值越大分数越高)
-                        fault_scores[fault_type] += amp * 10
-        
+        peaks = fft_result['peaks']
+        freqs = np.array([[peak['frequency'] for peak in peaks]], dtype=np.float64)
+        amps = np.array([[peak['amplitude'] for peak in peaks]], dtype=np.float64)
+        
+        fault_types, scores = self.score_faults(freqs, amps)
+        result = self._fault_decision(fault_types, scores[0])
+        result['all_scores'] = dict(zip(fault_types, scores[0].tolist()))
+        return result
+    
+    def _fault_decision(self, fault_types, scores):
+        """根据一组故障得分判断是否存在故障"""
         # 找出得分最高的故障类型
-        max_fault = max(fault_scores.items(), key=lambda x: x[1])
+        best = int(np.argmax(scores))
         
         # 如果分数超过阈值，认为存在故障
-        if max_fault[1] > 0.2:
-            confidence = min(max_fault[1], 1.0)  # 限制置信度在0-1之间
+        if scores[best] > self.fault_threshold:
+            confidence = min(float(scores[best]), 1.0)  # 限制置信度在0-1之间
             return {
                 'detected': True,
-                'fault_type': max_fault[0],
-                'confidence': confidence,
-                'all_scores': fault_scores
+                'fault_type': fault_types[best],
+                'confidence': confidence
             }
         else:
             return {
-                'detected': False,
-                'all_scores': fault_scores
+                'detected': False
             }
     
+    def score_faults(self, freqs, amps):
+        """
+        批量计算故障得分(向量化，实时检测和历史回放共用)
+        
+        峰值频率与某故障特征频率的差小于fault_tolerance时，该故障类型得分增加幅值的10倍
+        
+        参数:
+            freqs: 峰值频率数组，形状(样本数, 峰值数)，峰值不足的位置填NaN
+            amps: 峰值幅值数组，形状与freqs相同
+            
+        返回:
+            (故障类型列表, 得分数组(样本数, 故障类型数))
+        """
+        fault_types = list(self.fault_frequencies)
+        table = np.array([f for fault_type in fault_types for f in self.fault_frequencies[fault_type]])
+        # 每个特征频率所属故障类型的独热矩阵(特征频率数, 故障类型数)
+        owner = np.repeat(np.eye(len(fault_types)),
+                          [len(self.fault_frequencies[fault_type]) for fault_type in fault_types], axis=0)
+        
+        near = np.abs(freqs[..., None] - table) < self.fault_tolerance
+        contributions = np.where(near, amps[..., None] * 10, 0.0).sum(axis=1)
+        return fault_types, contributions @ owner
+    
     def _send_vibration_alert(self, magnitude, fault_type, detection_result):
         """发送振动异常警报到主系统"""
         try:
@@ -341,6 +626,7 @@ class VibrationSensor(BaseSensor):
             }
             
             # 发送到主系统
+            import requests
             response = requests.post(
                 'http://localhost:5000/api/alerts',
                 json=alert_data,